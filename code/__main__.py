@@ -22,7 +22,11 @@ Date:   November 1, 2017 (Python 3 Version)
 """
 from consts import *
 from app import *
+import os
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    # Set INVADERS_RECORD (or INVADERS_PLAYBACK) to a file to record (or replay) a session
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,
+             record=os.environ.get('INVADERS_RECORD'),
+             playback=os.environ.get('INVADERS_PLAYBACK')).run()
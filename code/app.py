@@ -13,7 +13,7 @@ Hartek Sabharwal hs786
 3 Dec 2017
 """
 from consts import *
-from game2d import *
+from game2d import GameApp, GLabel, GGlyphLabel, GlyphAtlas
 from wave import *
 
 
@@ -78,6 +78,13 @@ class Invaders(GameApp):
         _welcomeMessage: the welcome message to display
                     [GLabel if _state is STATE_INACTIVE, None if _state is not
                     STATE_INACTIVE]
+        _hud:       the counters for the lives left and the frame rate
+                    [GGlyphLabel]
+        _fps:       the smoothed frame rate shown in _hud
+                    [float >= 0]
+    
+    The view has two extra static layers: 'static' (under the default layer)
+    for the defense line and 'messages' (on top) for _text.
     """
     
     # DO NOT MAKE A NEW INITIALIZER!
@@ -97,13 +104,24 @@ class Invaders(GameApp):
         to play a game.
         """
         self._state = STATE_INACTIVE
-        self._welcomeMessage = GLabel(text="Press 's' to start",
+        # Load the assets in the background while the welcome screen is up
+        self.preload_assets(font_sizes=(FONT_SIZE,))
+        self._welcomeMessage = GLabel(text=self.__welcomeText(),
                                       font_size=FONT_SIZE,font_name="RetroGame",
                                       x = GAME_WIDTH//2, y = GAME_HEIGHT//2,
                                       linecolor='black')
         self._text = self._welcomeMessage
         self._wave = None
         self._keyPressed = False
+        GlyphAtlas.seed((HUD_FONT_SIZE,))
+        self._hud = GGlyphLabel(font_name=HUD_FONT, font_size=HUD_FONT_SIZE,
+                                x = HUD_MARGIN, y = GAME_HEIGHT-HUD_MARGIN-
+                                HUD_FONT_SIZE//2, halign='left',
+                                linecolor='black')
+        self._fps = 0
+        # The defense line and the messages rarely change, so they are cached
+        self.view.add_layer('static',static=True,below='default')
+        self.view.add_layer('messages',static=True)
         
     def update(self,dt):
         """
@@ -148,17 +166,24 @@ class Invaders(GameApp):
         
         STATE_COMPLETE: The wave is over, and is either won or lost.
         
+        Nothing on screen changes in STATE_PAUSED or STATE_COMPLETE (or in 
+        STATE_INACTIVE once the assets are loaded) until the player presses a
+        key. So in these states the game is held, and is not redrawn until the
+        next key press.
+        
         You are allowed to add more states if you wish. Should you do so, you
         should describe them here.
         
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        self.__hudHandler(dt)
         if self._state == STATE_NEWWAVE:
             self._wave = Wave()
             self._state = STATE_ACTIVE
             self._text = None
         if self._state == STATE_INACTIVE:
+            self.__loadingHandler()
             #inspired by state.py by Prof Walker White, _determineState method
             if (not self._keyPressed and self.input.is_key_down('s')):
                 self._state = STATE_NEWWAVE
@@ -174,6 +199,9 @@ class Invaders(GameApp):
                 self._wave.setShip(Ship())
                 self._state = STATE_ACTIVE
                 self._text = None
+        if self._state == STATE_PAUSED or self._state == STATE_COMPLETE or \
+                (self._state == STATE_INACTIVE and self.preloader.done):
+            self.hold()
                 
     def draw(self):
         """
@@ -188,11 +216,52 @@ class Invaders(GameApp):
         suggest the latter.  See the example subcontroller.py from class.
         """
         if self._state == STATE_ACTIVE or self._state == STATE_PAUSED:
-            self._wave.draw(self.view)
+            self._wave.draw(self.view,'static')
         if self._state != STATE_ACTIVE:
-            self._text.draw(self.view)
+            self._text.draw(self.view,'messages')
+        self._hud.draw(self.view)
             
     # HELPER METHODS FOR THE STATES GO HERE
+    def __hudHandler(self, dt):
+        """
+        Updates the lives and frame rate counters in _hud.
+        
+        The frame rate is smoothed so that it is readable. The counters change
+        almost every frame, which is why _hud is a GGlyphLabel and not a GLabel.
+        
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if dt > 0:
+            self._fps += FPS_SMOOTHING*(1/dt-self._fps)
+        text = 'FPS '+str(int(self._fps))
+        if not self._wave is None:
+            text = 'LIVES '+str(self._wave.getLives())+'  '+text
+        self._hud.text = text
+    
+    def __welcomeText(self):
+        """
+        Returns the text of the welcome message.
+        
+        While the assets are still loading, the message shows the loading
+        progress as a percentage. Afterwards it tells the player how to start.
+        """
+        if self.preloader.done:
+            return "Press 's' to start"
+        return "Loading "+str(int(100*self.preloader.progress))+"%"
+    
+    def __loadingHandler(self):
+        """
+        Updates the welcome message with the asset loading progress.
+        
+        The text is only changed when the percentage changes, since every
+        change to a GLabel has to render the text again.
+        """
+        if not self._welcomeMessage is None:
+            text = self.__welcomeText()
+            if text != self._welcomeMessage.text:
+                self._welcomeMessage.text = text
+    
     def __activeStateHandler(self, dt):
         """
         Animates a single frame of the game while state is STATE_ACTIVE.
@@ -142,8 +142,8 @@ FONT_SIZE = 30
 #filenames of film strips of each type of alien and also the boss image
 ALIEN_STRIP_IMAGES  = ('alien-strip1.png','alien-strip2.png','alien-strip3.png',
                        'boss.png')
-#Slows down the frame rate of the alien explosion animation by a factor of this
-EXPLOSION_SPEED = 3
+#Seconds each frame of the alien explosion animation is shown
+EXPLOSION_FRAME_TIME = 0.05
 #Absolute value of speed change of ship every update for which player holds down
 #right or left arrow key
 SHIP_ACCELERATION = 0.15
@@ -171,4 +171,12 @@ BOSS_HEIGHT = 75
 #The width of the boss image in pixels
 BOSS_WIDTH = 75
 #Half the number of degrees in a circle
-DEGREES = 180
\ No newline at end of file
+DEGREES = 180
+#The font of the on-screen counters (lives and frame rate)
+HUD_FONT = 'Arcade.ttf'
+#The font size of the on-screen counters
+HUD_FONT_SIZE = 20
+#The distance of the on-screen counters from the edges of the game screen
+HUD_MARGIN = 10
+#The weight of the newest frame when smoothing the displayed frame rate
+FPS_SMOOTHING = 0.05
\ No newline at end of file
@@ -4,13 +4,57 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+The classes of this module are imported the first time they are used, not when the
+module is imported.  So ``import game2d`` is cheap, and a program only pays for the
+parts of Kivy (and NumPy) that it actually uses.  The script :mod:`game2d.budget`
+measures the import times.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import importlib
+
+# The submodule defining each public name
+_EXPORTS = {
+    'GObject': 'gobject', 'GScene': 'gobject', 'set_transforms': 'gobject',
+    'color_stats': 'gobject',
+    'GRectangle': 'grectangle', 'GEllipse': 'grectangle', 'GImage': 'grectangle',
+    'GLabel': 'grectangle',
+    'GSprite': 'gsprite',
+    'GGlyphLabel': 'gtext', 'GlyphAtlas': 'gtext',
+    'GPath': 'gpath', 'GTriangle': 'gpath', 'GPolygon': 'gpath',
+    'GParticles': 'gparticle',
+    'GInput': 'gview', 'GView': 'gview', 'InputEvent': 'gview', 'InputFrame': 'gview',
+    'GSoftView': 'gsoftware',
+    'Sound': 'sound', 'SoundPool': 'sound', 'SoundLibrary': 'sound',
+    'PCMBuffer': 'sound', 'AudioThread': 'sound',
+    'AssetPreloader': 'assets', 'AssetManifest': 'assets',
+    'FrameRecorder': 'gcapture',
+    'FrameScheduler': 'gclock',
+    'InputReader': 'greplay', 'InputWriter': 'greplay',
+    'GameApp': 'app',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Returns: The public name ``name``, importing its submodule on first use
+    
+    :param name: The attribute name
+    :type name:  ``str``
+    """
+    if not name in _EXPORTS:
+        raise AttributeError('module %s has no attribute %s' % (repr(__name__),repr(name)))
+    
+    value = getattr(importlib.import_module('.'+_EXPORTS[name],__name__),name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    Returns: The names of this module, including those not yet imported
+    """
+    return sorted(set(globals()) | set(__all__))
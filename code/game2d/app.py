@@ -15,7 +15,8 @@ import kivy.app
 from kivy.config import Config
 from kivy.clock  import Clock
 
-import os.path
+from collections import OrderedDict
+from .gobject import GObject
 
 class GameApp(kivy.app.App):
     """
@@ -37,7 +38,19 @@ class GameApp(kivy.app.App):
     thing you should have in this method are calls to ``self.view.draw()``.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    TEXTURE_CACHE = OrderedDict()
+    # The number of bytes the texture cache may hold before evicting textures
+    TEXTURE_BUDGET = 64*1024*1024
+    # Class attribute for tracking the performance of the texture cache
+    TEXTURE_STATS = {'hits':0, 'misses':0, 'evictions':0, 'bytes':0}
+    # The number of unchanged frames before the game drops to the idle frame rate
+    IDLE_FRAMES = 30
+    # The most simulation ticks run in one animation frame (if there is a tick rate)
+    MAX_TICKS = 5
+    # Class attribute for the listing of the asset folders (made at startup)
+    MANIFEST = None
+    # The file caching the asset listing, in the game folder (None for no file)
+    MANIFEST_INDEX = '.game2d-assets'
     
     
     # MUTABLE ATTRIBUTES
@@ -48,7 +61,8 @@ class GameApp(kivy.app.App):
         
         By default this value is 60 FPS. However, we cannot guarantee that the FPS is 
         achievable.  If you are having performance stuttering, you might want to drop
-        this value to 30 FPS instead.
+        this value to 30 FPS instead.  The attribute ``scheduler`` reports the frame
+        rate actually achieved.
         
         **Invariant**: Must be an int or float > 0.
         """
@@ -58,9 +72,59 @@ class GameApp(kivy.app.App):
     def fps(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value > 0, 'value %s is not positive' % repr(value)
-        Clock.unschedule(self._refresh)
         self._fps = value
-        Clock.schedule_interval(self._refresh,1.0/self._fps)
+        if not self._scheduler is None and not self._idle:
+            self._scheduler.fps = value
+    
+    @property
+    def tick_rate(self):
+        """
+        The number of simulation ticks per second (or None)
+        
+        If this value is None (the default), ``update`` is called once per animation
+        frame with the time since the last frame.  Otherwise, ``update`` is called 
+        ``tick_rate`` times a second, each time with ``dt`` equal to ``1/tick_rate``, 
+        however many frames are drawn.  A frame may run several ticks, or none at all.
+        Between ticks, the objects that moved in the last tick are drawn part of the 
+        way from their previous position and angle to the current one.  So the game
+        may be simulated at a low rate and still animate smoothly.
+        
+        As the drawing lags one tick behind the simulation, the tick rate should not be
+        too low.  If the game falls behind by more than ``MAX_TICKS`` ticks, the rest 
+        of the time is dropped.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tick_rate
+    
+    @tick_rate.setter
+    def tick_rate(self,value):
+        assert value is None or (type(value) in [int,float] and value > 0), \
+                'value %s is not a valid tick rate' % repr(value)
+        self._tick_rate = value
+        self._lag = 0.0
+        GObject.ALPHA = 1.0
+    
+    @property
+    def idle_fps(self):
+        """
+        The number of frames-per-second to animate while the game is idle
+        
+        The game is idle once ``IDLE_FRAMES`` frames in a row have drawn nothing new.
+        It returns to the normal ``fps`` as soon as a frame changes something, or there
+        is a key or touch event.  By default this value is 10 FPS.
+        
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._idle_fps
+    
+    @idle_fps.setter
+    def idle_fps(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._idle_fps = value
+        if not self._scheduler is None and self._idle:
+            self._scheduler.fps = value
     
     
     # IMMUTABLE PROPERTIES
@@ -94,6 +158,58 @@ class GameApp(kivy.app.App):
         """
         return self._view
     
+    @property
+    def preloader(self):
+        """
+        The asset preloader, if one was started.
+        
+        Use the method :meth:`preload_assets` to start loading assets in the background.
+        See the class :class:`AssetPreloader` for more information.
+        
+        **Invariant**: Must be instance of :class:`AssetPreloader` or None
+        """
+        return self._preloader
+    
+    @property
+    def idle(self):
+        """
+        Whether the game is idle or held.
+        
+        An idle game animates at ``idle_fps``.  A held game (see :meth:`hold`) does not
+        animate at all.  Either way, the game wakes up on the next key or touch event.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._idle or self._held
+    
+    @property
+    def scheduler(self):
+        """
+        The frame scheduler that runs the animation loop.
+        
+        Use this attribute to read the frame rate achieved, the frame jitter and the 
+        idle fraction of the game.  This value is None until the game is running.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a :class:`FrameScheduler` or None.
+        """
+        return self._scheduler
+    
+    @property
+    def recorder(self):
+        """
+        The frame recorder, if the game is being captured.
+        
+        Use the method :meth:`start_capture` to record the game window to disk.  See the 
+        class :class:`FrameRecorder` for more information.
+        
+        **Invariant**: Must be instance of :class:`FrameRecorder` or None
+        """
+        return self._recorder
+    
     @property
     def input(self):
         """
@@ -107,12 +223,42 @@ class GameApp(kivy.app.App):
         return self._input
     
     # CLASS METHODS
+    @classmethod
+    def set_folder(cls,path):
+        """
+        Sets the folder containing the **Images**, **Fonts** and **Sounds** folders.
+        
+        This method lists the assets in those folders (see :class:`AssetManifest`), so 
+        that :meth:`is_image`, :meth:`is_font` and :meth:`is_sound` can find them.  It
+        is called for you when a game is created, with the folder of the game module.  
+        Call it yourself to make game objects without a game, for example to draw them 
+        into a :class:`GSoftView` on a headless server.
+        
+        :param path: The folder containing the asset folders
+        :type path:  ``str``
+        """
+        import os
+        from .assets import AssetManifest
+        assert type(path) == str and os.path.isdir(path), '%s is not a folder' % repr(path)
+        
+        GameApp.fonts  = str(os.path.join(path, 'Fonts'))
+        GameApp.sounds = str(os.path.join(path, 'Sounds'))
+        GameApp.images = str(os.path.join(path, 'Images'))
+        index = None if GameApp.MANIFEST_INDEX is None else os.path.join(path,GameApp.MANIFEST_INDEX)
+        GameApp.MANIFEST = AssetManifest(path,index)
+        
+        import kivy.resources
+        kivy.resources.resource_add_path(GameApp.fonts)
+        kivy.resources.resource_add_path(GameApp.sounds)
+        kivy.resources.resource_add_path(GameApp.images)
+    
     @classmethod
     def is_image(cls,name):
         """
         Checks if ``name`` refers to an image file
     
-        The method searches the **Images** folder for the given file name.
+        The method looks up the given file name in the manifest of the **Images** 
+        folder, made when the game starts.
     
         :param name: The file name
         :type name:  ``str``
@@ -123,14 +269,15 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
     
-        return os.path.exists(cls.images+'/'+name)
+        return cls.MANIFEST is not None and ('images',name) in cls.MANIFEST
     
     @classmethod
     def is_font(cls,name):
         """
         Checks if ``name`` refers to a font file
         
-        The method searches the **Fonts** folder for the given file name.
+        The method looks up the given file name in the manifest of the **Fonts** 
+        folder, made when the game starts.
         
         :param name: The file name
         :type name:  ``str``
@@ -141,14 +288,15 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
         
-        return os.path.exists(cls.fonts+'/'+name)
+        return cls.MANIFEST is not None and ('fonts',name) in cls.MANIFEST
     
     @classmethod
     def is_sound(cls,name):
         """
         Checks if ``name`` refers to a sound file
         
-        The method searches the **Sounds** folder for the given file name.
+        The method looks up the given file name in the manifest of the **Sounds** 
+        folder, made when the game starts.
         
         :param name: The file name
         :type name:  ``str``
@@ -159,7 +307,7 @@ class GameApp(kivy.app.App):
         if type(name) != str:
             return False
         
-        return os.path.exists(os.path.join(cls.sounds,name))
+        return cls.MANIFEST is not None and ('sounds',name) in cls.MANIFEST
     
     @classmethod
     def load_texture(cls,name):
@@ -170,6 +318,10 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
         
+        The cache is limited to ``TEXTURE_BUDGET`` bytes.  If loading a texture puts the
+        cache over budget, the least recently used textures are evicted.  The texture
+        just loaded is never evicted, even if it is larger than the budget by itself.
+        
         This method will crash if name is not a valid file.
         
         :param name: The file name
@@ -177,12 +329,15 @@ class GameApp(kivy.app.App):
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
         if name in cls.TEXTURE_CACHE:
+            cls.TEXTURE_STATS['hits'] += 1
+            cls.TEXTURE_CACHE.move_to_end(name)
             return cls.TEXTURE_CACHE[name]
         
+        cls.TEXTURE_STATS['misses'] += 1
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
-            cls.TEXTURE_CACHE[name] = texture
+            cls._store_texture(name,texture)
         except:
             texture = None
         
@@ -202,12 +357,107 @@ class GameApp(kivy.app.App):
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
         if name in cls.TEXTURE_CACHE:
-            texture = cls.TEXTURE_CACHE[name]
-            del cls.TEXTURE_CACHE[name]
+            texture = cls.TEXTURE_CACHE.pop(name)
+            cls.TEXTURE_STATS['bytes'] -= cls._texture_bytes(texture)
+            cls._release_frames(name)
             return texture
         
         return None
     
+    @classmethod
+    def preload(cls,names):
+        """
+        Returns: The number of textures in ``names`` that are now in the cache
+        
+        This method warms the texture cache, so that the first frame using these images
+        does not stall while they are decoded.  You should call it before starting a new
+        wave or level.  Textures that are already cached are only marked as recently used.
+        
+        Preloading more bytes than ``TEXTURE_BUDGET`` will evict the earliest textures in
+        ``names``, so the budget should be large enough for a whole level.
+        
+        :param names: The image file names to load
+        :type names:  iterable of ``str``
+        """
+        loaded = 0
+        for name in names:
+            if not cls.load_texture(name) is None:
+                loaded += 1
+        return loaded
+    
+    @classmethod
+    def texture_stats(cls):
+        """
+        Returns: A dictionary of statistics about the texture cache
+        
+        The dictionary has the keys 'hits', 'misses', 'evictions', 'bytes' (the resident 
+        bytes of all cached textures), 'count' (the number of cached textures), and 
+        'budget' (the value of ``TEXTURE_BUDGET``).  The dictionary is a copy, so changing
+        it has no effect on the cache.
+        """
+        result = dict(cls.TEXTURE_STATS)
+        result['count']  = len(cls.TEXTURE_CACHE)
+        result['budget'] = cls.TEXTURE_BUDGET
+        return result
+    
+    @classmethod
+    def _store_texture(cls,name,texture):
+        """
+        Adds a loaded texture to the texture cache, evicting textures if necessary.
+        
+        This method is used by :meth:`load_texture` and by the asset preloader, which
+        decodes images on a separate thread.  If the texture was already cached, the
+        cached texture is replaced.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param texture: The loaded texture
+        :type texture:  ``kivy.graphics.texture.Texture``
+        """
+        if name in cls.TEXTURE_CACHE:
+            cls.TEXTURE_STATS['bytes'] -= cls._texture_bytes(cls.TEXTURE_CACHE.pop(name))
+        cls.TEXTURE_CACHE[name] = texture
+        cls.TEXTURE_STATS['bytes'] += cls._texture_bytes(texture)
+        cls._evict_textures()
+    
+    @classmethod
+    def _texture_bytes(cls,texture):
+        """
+        Returns: The estimated number of bytes used by ``texture``
+        
+        Textures are assumed to be stored as 4 bytes (RGBA) per pixel.
+        
+        :param texture: The texture to measure
+        :type texture:  ``kivy.graphics.texture.Texture``
+        """
+        return int(texture.width)*int(texture.height)*4
+    
+    @classmethod
+    def _evict_textures(cls):
+        """
+        Evicts least recently used textures until the cache is within budget.
+        
+        The most recently used texture is never evicted.
+        """
+        while cls.TEXTURE_STATS['bytes'] > cls.TEXTURE_BUDGET and len(cls.TEXTURE_CACHE) > 1:
+            name, texture = cls.TEXTURE_CACHE.popitem(last=False)
+            cls.TEXTURE_STATS['bytes'] -= cls._texture_bytes(texture)
+            cls.TEXTURE_STATS['evictions'] += 1
+            cls._release_frames(name)
+    
+    @classmethod
+    def _release_frames(cls,name):
+        """
+        Releases any filmstrip frames that were sliced from the given texture.
+        
+        :param name: The file name of the texture
+        :type name:  ``str``
+        """
+        from .gsprite import GSprite
+        for key in [k for k in GSprite.FRAME_CACHE if k[0] == name]:
+            del GSprite.FRAME_CACHE[key]
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -220,6 +470,21 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        You may also use the keyword ``texture_budget`` to set the maximum number of 
+        bytes in the texture cache (see ``TEXTURE_BUDGET``), the keyword ``idle_fps``
+        to set the frame rate when nothing is changing, and the keyword ``tick_rate``
+        to simulate the game at a fixed rate (see the attribute ``tick_rate``).
+        
+        For testing and benchmarking, the keyword ``record`` is a file to record the 
+        input of the session to.  The keyword ``playback`` replays the input of a 
+        session instead of reading the keyboard and mouse.  It is either a recorded file,
+        or a script: an iterable giving a (dt, events) pair for each update, where events
+        is a sequence of (kind, key, x, y) tuples (see :class:`InputEvent`).  Playback 
+        runs as fast as the game can draw, and the game stops when the input runs out.
+        Both modes seed the ``random`` module, with the keyword ``seed`` or the seed of
+        the recording, so that the session plays out the same way.  Anything else the 
+        game depends on, such as the time taken to preload assets, is not replayed.
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -232,18 +497,51 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        i = keywords.pop('idle_fps', 10.0)
+        t = keywords.pop('tick_rate', None)
+        b = keywords.pop('texture_budget', GameApp.TEXTURE_BUDGET)
+        r = keywords.pop('record', None)
+        p = keywords.pop('playback', None)
+        s = keywords.pop('seed', None)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert type(i) in [int,float] and i > 0, 'idle_fps %s is not a positive number' % repr(i)
+        assert type(b) == int and b > 0, 'texture_budget %s is not a positive int' % repr(b)
+        assert r is None or type(r) == str, 'record %s is not a path' % repr(r)
+        assert s is None or (type(s) == int and s >= 0), 'seed %s is not a valid seed' % repr(s)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._idle_fps = i
+        self.tick_rate = t
+        GameApp.TEXTURE_BUDGET = b
+        self._preloader = None
+        self._recorder  = None
+        self._scheduler = None
+        self._unchanged = 0
+        self._idle = False
+        self._held = False
+        self._input = None
+        
+        self._record = r
+        self._replay = p
+        self._seed   = s
+        if type(p) == str:
+            from .greplay import InputReader
+            self._replay = InputReader(p)
+            self._seed = self._replay.seed
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
+        if not self._replay is None:
+            # Let the Kivy loop run as fast as the game can draw.  The clock read the
+            # configured cap when Kivy was imported, so the live clock is changed too.
+            Config.set('graphics', 'maxfps', '0')
+            Clock._max_fps = 0.0
         self._setpaths()
         
         # Tell Kivy to build the application
@@ -262,7 +560,9 @@ class GameApp(kivy.app.App):
         self._view = GView()
         self._view.size_hint = (1,1)
         self._input = GInput()
-        self._input._register(self._view)
+        if not self._replay is None:
+            self._input._play(self._replay)
+        self._input._register(self._view,self._wake)
         return self.view
     
     def run(self):
@@ -283,9 +583,85 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
+        if not self._scheduler is None:
+            self._scheduler.stop()
+        if not self._input is None:
+            self._input._stop_recording()
+        self.stop_capture()
+        from .sound import AudioThread
+        AudioThread.shutdown()
         kivy.app.App.stop(self)
         sys.exit(0)
     
+    def preload_assets(self,**keywords):
+        """
+        Starts loading the game assets in the background.
+        
+        Images, sounds and fonts are decoded on a worker thread, and then finished a few
+        at a time at the start of each animation frame.  Call this method in `start`, 
+        and use the attribute ``preloader`` to check on its progress (for example, to 
+        show a loading message on the welcome screen).
+        
+        The keywords are those of :class:`AssetPreloader`.  If the preloader is already
+        running, this method does nothing.
+        
+        :param keywords: dictionary of keyword arguments 
+        :type keywords:  keys are :class:`AssetPreloader` parameters
+        """
+        if self._preloader is None:
+            from .assets import AssetPreloader
+            self._preloader = AssetPreloader(**keywords)
+            self._preloader.start()
+    
+    def start_capture(self,path,**keywords):
+        """
+        Starts recording the game window to disk.
+        
+        Every frame drawn is read back and written on a background thread, either to a
+        single file of raw RGB frames or to a folder of PNG files.  Frames are dropped if
+        the disk cannot keep up.  Use the attribute ``recorder`` to check the number of
+        frames written and dropped, and the time the capture adds to each frame.
+        
+        The keywords are those of :class:`FrameRecorder`.  If the game is already being
+        recorded, that capture is stopped first.
+        
+        :param path: The file (for raw captures) or folder (for PNG captures) to write
+        :type path:  ``str``
+        
+        :param keywords: dictionary of keyword arguments 
+        :type keywords:  keys are :class:`FrameRecorder` parameters
+        """
+        from .gcapture import FrameRecorder
+        self.stop_capture()
+        self._recorder = FrameRecorder(path,**keywords)
+        self._recorder.start()
+    
+    def stop_capture(self):
+        """
+        Stops recording the game window, waiting for the queued frames to be written.
+        
+        The attribute ``recorder`` keeps the finished recorder, so its statistics may
+        still be read.  This method does nothing if the game is not being recorded.
+        """
+        if not self._recorder is None:
+            self._recorder.stop()
+    
+    def hold(self):
+        """
+        Stops animating the game until the next key or touch event.
+        
+        Call this method in ``update`` when the game will not change until the player
+        does something, such as on a pause screen.  The current frame is still drawn. 
+        After that, neither ``update`` nor ``draw`` are called, and the window is not
+        redrawn, until there is an input event.  The first frame after that has a 
+        small ``dt``, not the time the game was held.
+        
+        Assets being preloaded are not finished while the game is held.  This method
+        does nothing while input is played back, as there is no input to wait for.
+        """
+        if not self.input.playing:
+            self._held = True
+    
     def start(self):
         """
         Initializes the game state, creating a new game.
@@ -331,12 +707,22 @@ class GameApp(kivy.app.App):
         Bootstraps the clock scheduler for the game..
         
         This method is a callback-proxy for method `start`.  It handles important issues 
-        behind the scenes, particularly with setting the FPS
-        """
-        if (self.fps < 60):
-            Clock.schedule_interval(self._refresh,1.0/self.fps)
-        else:
-            Clock.schedule_interval(self._refresh,0)
+        behind the scenes, particularly with setting the FPS.  The animation frames are
+        timed by a :class:`FrameScheduler`, which sleeps between frames instead of
+        polling the clock.
+        """
+        from .gclock import FrameScheduler
+        if not self._record is None or not self._replay is None:
+            import random
+            if self._seed is None:
+                self._seed = random.randrange(1 << 32)
+            random.seed(self._seed)
+        if not self._record is None:
+            from .greplay import InputWriter
+            self.input._start_recording(InputWriter(self._record,self._seed))
+        
+        self._scheduler = FrameScheduler(self._refresh,self.fps,throttle=self._replay is None)
+        self._scheduler.start()
         self.start()
     
     def _refresh(self,dt):
@@ -344,33 +730,82 @@ class GameApp(kivy.app.App):
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window.  It
+        also drops to the idle frame rate once nothing has changed for ``IDLE_FRAMES``
+        frames, and stops the animation if the game was held.
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        loading = not self._preloader is None and not self._preloader.done
+        if loading:
+            self._preloader.finalize()
+        epoch = GObject.EPOCH
         self.view.clear()
-        self.update(dt)
+        if self._tick_rate is None:
+            GObject.TICK += 1
+            self.update(self.input._begin_frame(dt))
+        else:
+            self._simulate(dt)
         self.draw()
+        self.view.flush()
+        
+        # Throttle the frame rate if nothing has changed for a while
+        if self.view.changed or GObject.EPOCH != epoch or loading:
+            self._unchanged = 0
+            if self._idle:
+                self._idle = False
+                self._scheduler.fps = self.fps
+        else:
+            self._unchanged += 1
+            if not self._idle and self._unchanged >= GameApp.IDLE_FRAMES:
+                self._idle = True
+                self._scheduler.fps = self.idle_fps
+        if self._held:
+            self._scheduler.stop()
+        if not self._replay is None and not self.input.playing:
+            self.stop()
+    
+    def _simulate(self,dt):
+        """
+        Runs the simulation ticks due in this frame, and sets the interpolation.
+        
+        :param dt: time in seconds since last frame
+        :type dt:  ``int`` or ``float``
+        """
+        step = 1.0/self._tick_rate
+        self._lag += dt
+        ticks = 0
+        while self._lag >= step and ticks < GameApp.MAX_TICKS:
+            GObject.TICK += 1
+            self.update(self.input._begin_frame(step))
+            self._lag -= step
+            ticks += 1
+        if self._lag >= step:
+            self._lag = 0.0
+        GObject.ALPHA = self._lag/step
+    
+    def _wake(self):
+        """
+        Returns the game to the normal frame rate after an input event.
+        
+        This method is called by the input handler on every key or touch event.
+        """
+        self._unchanged = 0
+        if self._idle:
+            self._idle = False
+            self._scheduler.fps = self.fps
+        if self._held:
+            self._held = False
+            self._scheduler.start()
     
     def _setpaths(self):
         """
-        Sets the resource paths to the application directory.
+        Sets the resource paths to the application directory, and lists the assets.
         """
         # This prevents us from running two game simultaneously
         # But kivy already prevents this from happening
         import os, sys
-        import inspect
-        
-        path = os.path.abspath(inspect.getfile(self.__class__))
-        path = os.path.dirname(path)
-        
-        GameApp.fonts  = str(os.path.join(path, 'Fonts'))
-        GameApp.sounds = str(os.path.join(path, 'Sounds'))
-        GameApp.images = str(os.path.join(path, 'Images'))
-        
-        import kivy.resources
-        kivy.resources.resource_add_path(GameApp.fonts)
-        kivy.resources.resource_add_path(GameApp.sounds)
-        kivy.resources.resource_add_path(GameApp.images)
+        path = os.path.abspath(sys.modules[self.__class__.__module__].__file__)
+        GameApp.set_folder(os.path.dirname(path))
 
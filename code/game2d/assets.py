@@ -0,0 +1,452 @@
+"""
+Asset loading support for 2D games.
+
+This module provides a preloader that decodes the contents of the **Images**, **Sounds**
+and **Fonts** folders on a background thread.  Anything that needs the graphics context
+(such as uploading a texture) is finished on the main thread, a few assets per frame.
+
+It also provides the manifest of those folders, which lets the game check that an asset
+exists without touching the file system.
+"""
+import os
+import threading
+import time
+import queue
+
+
+class AssetPreloader(object):
+    """
+    A class that preloads game assets without stalling the animation.
+    
+    The preloader has two halves.  The worker thread decodes image files into pixel data,
+    loads sound files into the audio backend, and reads font files from disk.  The main
+    thread then finishes each asset in the method :meth:`finalize`, which uploads the
+    image textures to the texture cache of :class:`GameApp`, and rasterizes a small
+    sample of each font so that the font is open before it is first used by a label.
+    
+    The method :meth:`finalize` is called for you by :class:`GameApp` every animation
+    frame, with a small time budget.  Use the attributes :attr:`progress` and :attr:`done`
+    to display a loading message.
+    
+    **You should never construct an object of this class yourself**.  Use the method
+    ``preload_assets`` in :class:`GameApp` instead.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def total(self):
+        """
+        The number of assets to load.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._assets)
+    
+    @property
+    def decoded(self):
+        """
+        The number of assets decoded by the worker thread so far.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int in 0..total.
+        """
+        return self._decoded
+    
+    @property
+    def loaded(self):
+        """
+        The number of assets finalized on the main thread so far.
+        
+        Assets that failed to load are included in this count.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int in 0..total.
+        """
+        return self._loaded
+    
+    @property
+    def progress(self):
+        """
+        The fraction of assets that are ready to use.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        if not self._assets:
+            return 1.0
+        return self._loaded/float(len(self._assets))
+    
+    @property
+    def done(self):
+        """
+        Whether all of the assets are ready to use.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._loaded == len(self._assets)
+    
+    @property
+    def failed(self):
+        """
+        The (kind, name) pairs of the assets that could not be loaded.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a tuple of pairs of strings (possibly empty).
+        """
+        return tuple(self._failed)
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,images=None,sounds=None,fonts=None,font_sizes=(15,)):
+        """
+        Creates, but does not start, a new preloader.
+        
+        By default, the preloader loads every file in the **Images**, **Sounds** and
+        **Fonts** folders.  You can restrict this by giving the file names to load.  As
+        fonts are opened once per point size, ``font_sizes`` should include every size
+        used by the labels in the game.
+        
+        :param images: The image files to load (None for all of them)
+        :type images:  iterable of ``str`` or ``None``
+        
+        :param sounds: The sound files to load (None for all of them)
+        :type sounds:  iterable of ``str`` or ``None``
+        
+        :param fonts: The font files to load (None for all of them)
+        :type fonts:  iterable of ``str`` or ``None``
+        
+        :param font_sizes: The point sizes to open each font at
+        :type font_sizes:  iterable of ``int`` or ``float``
+        """
+        from .app import GameApp
+        images = GameApp.MANIFEST.names('images') if images is None else images
+        sounds = GameApp.MANIFEST.names('sounds') if sounds is None else sounds
+        fonts  = GameApp.MANIFEST.names('fonts','.ttf') if fonts is None else fonts
+        
+        self._assets  = [('image',x) for x in images if GameApp.is_image(x)]
+        self._assets += [('font',x)  for x in fonts  if GameApp.is_font(x)]
+        self._assets += [('sound',x) for x in sounds if GameApp.is_sound(x)]
+        self._sizes   = tuple(font_sizes)
+        
+        self._ready   = queue.Queue()
+        self._decoded = 0
+        self._loaded  = 0
+        self._failed  = []
+        self._thread  = None
+    
+    
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts decoding the assets on the worker thread.
+        
+        Calling this method more than once has no effect.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,name='game2d-preloader')
+            self._thread.daemon = True
+            self._thread.start()
+    
+    def finalize(self,budget=0.002):
+        """
+        Returns: The number of assets finalized by this call
+        
+        This method finishes the decoded assets on the main thread.  It stops once it
+        has spent ``budget`` seconds, though it always finalizes at least one asset if
+        one is ready.  It never waits for the worker thread.
+        
+        This method must be called from the main (Kivy) thread.
+        
+        :param budget: The number of seconds this call may spend
+        :type budget:  ``int`` or ``float`` >= 0
+        """
+        count = 0
+        start = time.perf_counter()
+        while not self.done and (count == 0 or time.perf_counter()-start < budget):
+            try:
+                kind, name, data = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            
+            try:
+                if data is None:
+                    raise IOError('cannot decode %s' % repr(name))
+                self._finalize(kind,name,data)
+            except:
+                self._failed.append((kind,name))
+            self._loaded += 1
+            count += 1
+        
+        return count
+    
+    
+    # HIDDEN METHODS
+    def _run(self):
+        """
+        Decodes each asset on the worker thread, queueing it for :meth:`finalize`.
+        """
+        for kind, name in self._assets:
+            try:
+                data = self._decode(kind,name)
+            except:
+                data = None
+            self._decoded += 1
+            self._ready.put((kind,name,data))
+    
+    def _decode(self,kind,name):
+        """
+        Returns: The decoded data for the given asset
+        
+        This method is called on the worker thread, so it cannot touch the graphics
+        context.
+        
+        :param kind: The asset kind
+        :type kind:  one of 'image', 'font' or 'sound'
+        
+        :param name: The file name of the asset
+        :type name:  ``str``
+        """
+        from .app import GameApp
+        if kind == 'image':
+            # The loader decodes the pixels now; the texture is made on first access
+            from kivy.core.image import ImageLoader
+            return ImageLoader.load(os.path.join(GameApp.images,name))
+        elif kind == 'sound':
+            # Map the samples into the shared buffer cache along with the voice
+            from kivy.core.audio import SoundLoader
+            from .sound import PCMBuffer
+            PCMBuffer.get(name)
+            return SoundLoader.load(os.path.join(GameApp.sounds,name))
+        
+        # Fonts are parsed by the text provider, so just pull them off the disk
+        with open(os.path.join(GameApp.fonts,name),'rb') as file:
+            return file.read()
+    
+    def _finalize(self,kind,name,data):
+        """
+        Finishes the given asset on the main thread.
+        
+        :param kind: The asset kind
+        :type kind:  one of 'image', 'font' or 'sound'
+        
+        :param name: The file name of the asset
+        :type name:  ``str``
+        
+        :param data: The result of :meth:`_decode` for this asset
+        :type data:  any
+        """
+        from .app import GameApp
+        if kind == 'image':
+            from kivy.core.image import Image
+            GameApp._store_texture(name,Image(data).texture)
+        elif kind == 'sound':
+            from .sound import Sound
+            Sound.PRELOADED.setdefault(name,[]).append(data)
+        else:
+            from kivy.core.text import Label
+            for size in self._sizes:
+                Label(text='0',font_name=name,font_size=size).refresh()
+
+
+# #mark -
+class AssetManifest(object):
+    """
+    A class listing the files in the **Images**, **Fonts** and **Sounds** folders.
+    
+    The folders are listed once, when the manifest is made, so that checking whether an
+    asset exists is a set lookup rather than a call to the file system.  The listing 
+    can also be saved to an index file.  The next time the game starts, the index is 
+    used instead of listing the folders again, as long as none of the folders has been
+    modified since it was written.
+    
+    Files in subfolders are listed by their path relative to the asset folder, using 
+    ``/`` as the separator.  Hidden files are skipped.
+    
+    **You should never construct an object of this class yourself**.  It is made for
+    you by :class:`GameApp`, and is its class attribute ``MANIFEST``.
+    """
+    # The asset folder for each kind of asset
+    FOLDERS = (('images','Images'), ('fonts','Fonts'), ('sounds','Sounds'))
+    # The version of the index file format
+    INDEX_VERSION = 1
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def root(self):
+        """
+        The folder containing the asset folders.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a string.
+        """
+        return self._root
+    
+    @property
+    def index(self):
+        """
+        The index file for this manifest (or None if it has none).
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a string or None.
+        """
+        return self._index
+    
+    @property
+    def cached(self):
+        """
+        Whether the listing was read from the index file.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._cached
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,root,index=None):
+        """
+        Creates the manifest of the asset folders in the given folder.
+        
+        If ``index`` is given, the listing is read from that file if it is still up 
+        to date.  Otherwise, the folders are listed and the index is rewritten.  An index
+        that cannot be written (for example, in a read-only folder) is ignored.
+        
+        :param root: The folder containing the asset folders
+        :type root:  ``str``
+        
+        :param index: The index file (None for no index)
+        :type index:  ``str`` or ``None``
+        """
+        assert type(root) == str, '%s is not a path' % repr(root)
+        assert index is None or type(index) == str, '%s is not a path' % repr(index)
+        self._root  = root
+        self._index = index
+        self._cached = not index is None and self._read()
+        if not self._cached:
+            self.refresh()
+    
+    def __contains__(self,item):
+        """
+        Returns: True if the given (kind, name) pair is an asset in this manifest
+        
+        :param item: The asset kind and file name
+        :type item:  (``str``, ``str``) where the kind is 'images', 'fonts' or 'sounds'
+        """
+        kind, name = item
+        return name in self._files[kind]
+    
+    
+    # PUBLIC METHODS
+    def names(self,kind,suffix=None):
+        """
+        Returns: The sorted file names of the given kind of asset
+        
+        :param kind: The kind of asset
+        :type kind:  one of 'images', 'fonts' or 'sounds'
+        
+        :param suffix: The (lower case) file suffix to require (or None)
+        :type suffix:  ``str`` or ``None``
+        """
+        return sorted(x for x in self._files[kind] if suffix is None or x.lower().endswith(suffix))
+    
+    def refresh(self):
+        """
+        Lists the asset folders again, rewriting the index file (if any).
+        
+        Call this method if the game writes new assets while it is running.
+        """
+        self._files  = {}
+        self._stamps = {}
+        # The root changes when a missing asset folder is made
+        try:
+            self._stamps[self._root] = os.stat(self._root).st_mtime_ns
+        except OSError:
+            pass
+        for kind, folder in self.FOLDERS:
+            self._files[kind] = frozenset(self._scan(os.path.join(self._root,folder),''))
+        self._cached = False
+        if not self._index is None:
+            self._write()
+    
+    
+    # HIDDEN METHODS
+    def _scan(self,path,prefix):
+        """
+        Returns: The file names in the given folder and its subfolders
+        
+        The modification time of each folder is recorded, to check the index later.
+        
+        :param path: The folder to list
+        :type path:  ``str``
+        
+        :param prefix: The relative path of the folder, ending in ``/`` (or empty)
+        :type prefix:  ``str``
+        """
+        result = []
+        try:
+            self._stamps[path] = os.stat(path).st_mtime_ns
+            entries = list(os.scandir(path))
+        except OSError:
+            return result
+        
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            elif entry.is_dir():
+                result += self._scan(entry.path,prefix+entry.name+'/')
+            else:
+                result.append(prefix+entry.name)
+        return result
+    
+    def _read(self):
+        """
+        Returns: True if the listing was read from an up to date index file
+        """
+        import json
+        try:
+            with open(self._index) as file:
+                data = json.load(file)
+            if data['version'] != self.INDEX_VERSION or data['root'] != self._root:
+                return False
+            for path, stamp in data['stamps'].items():
+                if os.stat(path).st_mtime_ns != stamp:
+                    return False
+        except (OSError, ValueError, KeyError):
+            return False
+        
+        self._files  = {kind: frozenset(data['files'][kind]) for kind, _ in self.FOLDERS}
+        self._stamps = data['stamps']
+        return True
+    
+    def _write(self):
+        """
+        Writes the listing to the index file, if possible.
+        
+        Making the index file for the first time changes the folder containing it.  If
+        that folder is stamped, the file is written again with the new stamp.
+        """
+        import json
+        folder = os.path.dirname(os.path.abspath(self._index))
+        for _ in range(2):
+            data = {'version': self.INDEX_VERSION, 'root': self._root, 'stamps': self._stamps,
+                    'files': {kind: sorted(names) for kind, names in self._files.items()}}
+            try:
+                with open(self._index,'w') as file:
+                    json.dump(data,file)
+                stamp = os.stat(folder).st_mtime_ns
+            except OSError:
+                return
+            if self._stamps.get(folder,stamp) == stamp:
+                return
+            self._stamps[folder] = stamp
@@ -0,0 +1,159 @@
+"""
+Import time budget for 2D games.
+
+This script measures how long it takes to import ``game2d`` and the game module ``wave``
+in a fresh interpreter, and compares each against a budget.  Run it from the folder
+containing the game, as follows::
+    
+    python -m game2d.budget
+
+Each import is timed with the ``-X importtime`` option of Python, in a new process each
+time so that nothing is already imported.  The best of several runs is reported, as
+it is the least disturbed by the rest of the machine.
+
+The time to import Kivy depends heavily on the machine, so the budget of ``wave`` is
+not a fixed number.  It is a measured baseline, recorded on the machine the game runs on
+with the option ``--record``, plus a small tolerance.  The script also checks that the
+modules deferred until first use (such as NumPy) are not imported at all.  It exits
+with status 1 if any import is over its budget, has no baseline, or loads a deferred
+module.
+"""
+import os
+import subprocess
+import sys
+
+# The fixed budget in seconds for importing each module (None to use the baseline)
+IMPORT_BUDGETS = (('game2d', 0.005), ('wave', None))
+# The fraction by which an import may exceed its recorded baseline
+IMPORT_TOLERANCE = 0.2
+# The modules that importing the game must not load
+DEFERRED_MODULES = ('numpy',)
+# The file holding the recorded baselines, next to this script
+BASELINE_FILE = 'import_baseline.json'
+# The number of times each import is measured
+IMPORT_RUNS = 5
+
+
+def measure(module,folder=None):
+    """
+    Returns: The import time in seconds and the modules loaded, for the given module
+    
+    The time is the cumulative time reported by ``-X importtime``, so it includes the
+    modules imported by this one, but not the start up of the interpreter.  The
+    modules are every module loaded by the import.
+    
+    :param module: The name of the module to import
+    :type module:  ``str``
+    
+    :param folder: The folder to run in (None for the current folder)
+    :type folder:  ``str`` or ``None``
+    """
+    result = subprocess.run([sys.executable,'-X','importtime','-c','import '+module],
+                            cwd=folder,stdout=subprocess.PIPE,stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    if result.returncode != 0:
+        raise ImportError('Cannot import %s:\n%s' % (repr(module),result.stderr))
+    
+    # Each line is "import time: self [us] | cumulative | name", indented by depth
+    elapsed = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[0].startswith('import time:'):
+            name = fields[2].strip()
+            loaded.add(name)
+            if name == module and fields[2].rstrip() == ' '+module:
+                elapsed = int(fields[1])/1e6
+    if elapsed is None:
+        raise ImportError('Python did not report the import of %s' % repr(module))
+    return elapsed, loaded
+
+
+def best(module,runs=IMPORT_RUNS,folder=None):
+    """
+    Returns: The best import time in seconds and the modules loaded, for the given module
+    
+    :param module: The name of the module to import
+    :type module:  ``str``
+    
+    :param runs: The number of times to measure the import
+    :type runs:  ``int`` > 0
+    
+    :param folder: The folder to run in (None for the current folder)
+    :type folder:  ``str`` or ``None``
+    """
+    assert type(runs) == int and runs > 0, '%s is not a valid number of runs' % repr(runs)
+    results = [measure(module,folder) for _ in range(runs)]
+    return min(x[0] for x in results), results[0][1]
+
+
+def record(budgets=IMPORT_BUDGETS,runs=IMPORT_RUNS,folder=None):
+    """
+    Measures every module without a fixed budget, and saves the times as baselines.
+    
+    :param budgets: The modules and their fixed budgets in seconds (or None)
+    :type budgets:  sequence of (``str``, ``float`` or ``None``) pairs
+    
+    :param runs: The number of times to measure each import
+    :type runs:  ``int`` > 0
+    
+    :param folder: The folder to run in (None for the current folder)
+    :type folder:  ``str`` or ``None``
+    """
+    import json
+    baselines = {}
+    for module, budget in budgets:
+        if budget is None:
+            baselines[module] = best(module,runs,folder)[0]
+            print('%-10s %8.1f ms  (recorded)' % (module,baselines[module]*1000))
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),BASELINE_FILE),'w') as file:
+        json.dump(baselines,file,indent=2,sort_keys=True)
+
+
+def check(budgets=IMPORT_BUDGETS,runs=IMPORT_RUNS,folder=None):
+    """
+    Returns: True if every module imports within its budget, loading no deferred module
+    
+    This function prints the best time of each module against its budget.
+    
+    :param budgets: The modules and their fixed budgets in seconds (or None)
+    :type budgets:  sequence of (``str``, ``float`` or ``None``) pairs
+    
+    :param runs: The number of times to measure each import
+    :type runs:  ``int`` > 0
+    
+    :param folder: The folder to run in (None for the current folder)
+    :type folder:  ``str`` or ``None``
+    """
+    import json
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),BASELINE_FILE)) as file:
+            baselines = json.load(file)
+    except (OSError, ValueError):
+        baselines = {}
+    
+    passed = True
+    for module, budget in budgets:
+        elapsed, loaded = best(module,runs,folder)
+        if budget is None and not module in baselines:
+            print('%-10s %8.1f ms  (no baseline: run with --record)  FAIL' % (module,elapsed*1000))
+            passed = False
+            continue
+        elif budget is None:
+            budget = baselines[module]*(1+IMPORT_TOLERANCE)
+        
+        early  = sorted(x for x in DEFERRED_MODULES if x in loaded)
+        status = 'ok' if elapsed <= budget and not early else 'OVER'
+        print('%-10s %8.1f ms  (budget %8.1f ms)  %s' % (module,elapsed*1000,budget*1000,status))
+        if early:
+            print('%-10s loads %s' % ('',', '.join(early)))
+        passed = passed and status == 'ok'
+    return passed
+
+
+if __name__ == '__main__':
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if '--record' in sys.argv[1:]:
+        record(folder=folder)
+    else:
+        sys.exit(0 if check(folder=folder) else 1)
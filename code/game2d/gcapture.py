@@ -0,0 +1,341 @@
+"""
+Frame capture for 2D games.
+
+This module provides a recorder that reads back every frame drawn in the game window
+and writes it to disk on a background thread.  The main thread only copies the pixels
+out of the frame buffer, so recording never waits on the disk.  If the writer falls
+behind, frames are dropped (and counted) rather than stalling the animation.
+
+Frames are written either as a single file of raw RGB chunks or as a folder of PNG
+files.  Each raw chunk is a little-endian header of three unsigned ints and a double
+(frame number, width, height, time in seconds) followed by width*height*3 bytes of
+pixels, with the top row first.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+# The header of each frame in a raw capture
+RAW_HEADER = struct.Struct('<IIId')
+
+
+class FrameRecorder(object):
+    """
+    A class that records the game window to disk.
+    
+    The recorder copies the window after every buffer flip (or every ``every`` flips)
+    into a bounded queue.  A writer thread takes the frames from the queue and writes
+    them out.  When the queue is full, the frame is dropped without being read back,
+    so a slow disk costs dropped frames, not frame rate.
+    
+    The attributes :attr:`captured`, :attr:`written` and :attr:`dropped` count the
+    frames, and :attr:`overhead` is the average time the main thread spends on each
+    captured frame.
+    
+    **You should never construct an object of this class yourself**.  Use the method
+    ``start_capture`` in :class:`GameApp` instead.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def path(self):
+        """
+        The file (for raw captures) or folder (for PNG captures) written to.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a string.
+        """
+        return self._path
+    
+    @property
+    def format(self):
+        """
+        The capture format.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be one of 'raw' or 'png'.
+        """
+        return self._format
+    
+    @property
+    def recording(self):
+        """
+        Whether the recorder is currently capturing frames.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._thread is not None
+    
+    @property
+    def captured(self):
+        """
+        The number of frames read back and queued for writing.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._captured
+    
+    @property
+    def written(self):
+        """
+        The number of frames written to disk.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int in 0..captured.
+        """
+        return self._written
+    
+    @property
+    def dropped(self):
+        """
+        The number of frames skipped because the writer fell behind or failed.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._dropped
+    
+    @property
+    def overhead(self):
+        """
+        The average time in seconds the main thread spent on each captured frame.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._overhead/self._captured if self._captured else 0.0
+    
+    @property
+    def error(self):
+        """
+        The error that stopped the writer thread (or None).
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an exception or None.
+        """
+        return self._error
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,path,format='raw',queue_size=8,every=1,level=1):
+        """
+        Creates, but does not start, a new frame recorder.
+        
+        :param path: The file (for raw captures) or folder (for PNG captures) to write
+        :type path:  ``str``
+        
+        :param format: The capture format
+        :type format:  one of 'raw' or 'png'
+        
+        :param queue_size: The number of frames that may wait for the writer
+        :type queue_size:  ``int`` > 0
+        
+        :param every: The number of buffer flips per captured frame
+        :type every:  ``int`` > 0
+        
+        :param level: The PNG compression level (0 is none, 9 is the most)
+        :type level:  ``int`` in 0..9
+        """
+        assert type(path) == str, '%s is not a path' % repr(path)
+        assert format in ('raw','png'), '%s is not a valid format' % repr(format)
+        assert type(queue_size) == int and queue_size > 0, '%s is not a valid queue size' % repr(queue_size)
+        assert type(every) == int and every > 0, '%s is not a valid interval' % repr(every)
+        assert type(level) == int and 0 <= level <= 9, '%s is not a valid level' % repr(level)
+        self._path   = path
+        self._format = format
+        self._every  = every
+        self._level  = level
+        self._queue  = queue.Queue(queue_size)
+        self._thread = None
+        self._error  = None
+        
+        self._flips    = 0
+        self._captured = 0
+        self._written  = 0
+        self._dropped  = 0
+        self._overhead = 0.0
+        self._maximum  = 0.0
+    
+    
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts capturing frames.
+        
+        Calling this method while the recorder is running has no effect.
+        """
+        if not self._thread is None:
+            return
+        
+        from kivy.core.window import Window
+        if self._format == 'png' and not os.path.isdir(self._path):
+            os.makedirs(self._path)
+        self._error  = None
+        self._thread = threading.Thread(target=self._run,name='game2d-capture')
+        self._thread.daemon = True
+        self._thread.start()
+        Window.bind(on_flip=self._capture)
+    
+    def stop(self):
+        """
+        Stops capturing frames, waiting for the queued frames to be written.
+        
+        Calling this method while the recorder is stopped has no effect.
+        """
+        if self._thread is None:
+            return
+        
+        from kivy.core.window import Window
+        Window.unbind(on_flip=self._capture)
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None,timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+        
+        # Frames left behind by a writer that failed are never written
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not item is None:
+                self._dropped += 1
+    
+    def stats(self):
+        """
+        Returns: A dictionary of statistics for this recorder
+        
+        The dictionary has the keys 'flips', 'captured', 'written', 'dropped', 'queued',
+        'overhead' (the average main thread time per captured frame) and 'overhead_max'.
+        """
+        return {'flips': self._flips, 'captured': self._captured,
+                'written': self._written, 'dropped': self._dropped,
+                'queued': self._queue.qsize(), 'overhead': self.overhead,
+                'overhead_max': self._maximum}
+    
+    
+    # HIDDEN METHODS
+    def _capture(self,window):
+        """
+        Reads back the frame just drawn, if there is room in the queue.
+        
+        This method is called by the window after each buffer flip.
+        
+        :param window: The game window
+        :type window:  ``kivy.core.window.Window``
+        """
+        self._flips += 1
+        if (self._flips-1) % self._every:
+            return
+        if self._queue.full() or not self._error is None:
+            self._dropped += 1
+            return
+        
+        from kivy.graphics.opengl import glReadPixels, glPixelStorei
+        from kivy.graphics.opengl import GL_RGB, GL_UNSIGNED_BYTE, GL_PACK_ALIGNMENT
+        start = time.perf_counter()
+        width, height = window.size
+        glPixelStorei(GL_PACK_ALIGNMENT,1)
+        data = glReadPixels(0,0,width,height,GL_RGB,GL_UNSIGNED_BYTE)
+        try:
+            self._queue.put_nowait((self._captured,width,height,start,data))
+            self._captured += 1
+        except queue.Full:
+            self._dropped += 1
+        
+        elapsed = time.perf_counter()-start
+        self._overhead += elapsed
+        self._maximum = max(self._maximum,elapsed)
+    
+    def _run(self):
+        """
+        Writes the queued frames until the recorder is stopped.
+        
+        This method runs on the writer thread.
+        """
+        file = None
+        try:
+            if self._format == 'raw':
+                file = open(self._path,'wb')
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                index, width, height, stamp, data = item
+                data = _flip_rows(data,width*3,height)
+                if file is None:
+                    name = os.path.join(self._path,'frame%06d.png' % index)
+                    with open(name,'wb') as png:
+                        png.write(_encode_png(data,width,height,self._level))
+                else:
+                    file.write(RAW_HEADER.pack(index,width,height,stamp))
+                    file.write(data)
+                self._written += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            if not file is None:
+                file.close()
+
+
+def _flip_rows(data,stride,height):
+    """
+    Returns: The pixel rows of data in the reverse order
+    
+    OpenGL reads the frame bottom row first, while images are stored top row first.
+    
+    :param data: The pixel data
+    :type data:  ``bytes``
+    
+    :param stride: The number of bytes per row
+    :type stride:  ``int`` > 0
+    
+    :param height: The number of rows
+    :type height:  ``int`` >= 0
+    """
+    return b''.join(data[y*stride:(y+1)*stride] for y in range(height-1,-1,-1))
+
+
+def _encode_png(data,width,height,level):
+    """
+    Returns: The given RGB pixels as the bytes of a PNG file
+    
+    :param data: The pixel data, top row first
+    :type data:  ``bytes``
+    
+    :param width: The image width
+    :type width:  ``int`` > 0
+    
+    :param height: The image height
+    :type height:  ``int`` > 0
+    
+    :param level: The compression level
+    :type level:  ``int`` in 0..9
+    """
+    stride = width*3
+    raw = b''.join(b'\x00'+data[y*stride:(y+1)*stride] for y in range(height))
+    
+    def chunk(tag,body):
+        crc = zlib.crc32(tag+body) & 0xffffffff
+        return struct.pack('>I',len(body))+tag+body+struct.pack('>I',crc)
+    
+    header = struct.pack('>IIBBBBB',width,height,8,2,0,0,0)
+    return (b'\x89PNG\r\n\x1a\n'+chunk(b'IHDR',header)+
+            chunk(b'IDAT',zlib.compress(raw,level))+chunk(b'IEND',b''))
@@ -0,0 +1,316 @@
+"""
+Frame timing for 2D games.
+
+This module provides the scheduler that calls the animation loop of a game.  Rather
+than asking the Kivy clock for a callback every loop (which keeps a core busy even when
+the game has nothing to do), the scheduler targets a fixed frame period.  It lets the
+Kivy clock sleep through most of the time to the next frame, sleeps again for the rest,
+and only spins for the last fraction of a millisecond.
+
+The scheduler measures how well it keeps time: the frame rate achieved, how late each
+frame starts (the jitter), how many frames were skipped, and the fraction of the time
+the process spent idle.
+"""
+import time
+from kivy.clock import Clock
+
+
+class FrameScheduler(object):
+    """
+    A class that calls a function once per frame at a target frame rate.
+    
+    Each frame has a deadline, one frame period after the last.  The callback is
+    called at the deadline with the time since the previous call.  If a frame runs long,
+    the next frame starts late, but the deadlines stay fixed so the frame rate recovers.
+    If the game falls more than a whole period behind, the scheduler skips the frames it
+    missed (when ``skip`` is True) rather than running them back to back.
+    
+    An unthrottled scheduler ignores the deadlines, and calls the callback once every
+    Kivy frame, as fast as the game can run.  This is used to replay recorded input
+    faster than real time.
+    
+    The statistics are measured over windows of ``WINDOW`` seconds.  So the attributes
+    :attr:`achieved`, :attr:`idle` and :attr:`jitter` describe the last full window.
+    
+    **You should never construct an object of this class yourself**.  It is made for
+    you by :class:`GameApp`, and is its attribute ``scheduler``.
+    """
+    # The time before a deadline at which the Kivy clock hands over to the scheduler
+    CLOCK_MARGIN = 0.004
+    # The time before a deadline at which the scheduler stops sleeping and spins
+    SPIN_MARGIN  = 0.0005
+    # The number of seconds in each statistics window
+    WINDOW = 1.0
+    
+    # MUTABLE PROPERTIES
+    @property
+    def fps(self):
+        """
+        The target number of frames per second.
+        
+        Changing this value starts the next frame one new period after the last.  If it
+        is changed by the callback, the new period starts from the current frame.
+        
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._fps
+    
+    @fps.setter
+    def fps(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._fps    = value
+        self._period = 1.0/value
+        # Inside the callback, _tick applies the new period when it schedules the next frame
+        if self.running and not self._calling:
+            self._deadline = self._last+self._period
+            self._schedule(time.perf_counter())
+    
+    @property
+    def skip(self):
+        """
+        Whether to skip the frames missed when the game falls behind.
+        
+        If this value is False, the scheduler runs late frames back to back until it
+        has caught up.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._skip
+    
+    @skip.setter
+    def skip(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._skip = value
+    
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def throttled(self):
+        """
+        Whether the scheduler waits for the frame deadlines.
+        
+        **Immutable**: This value cannot be changed after the scheduler is created.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._throttle
+    
+    @property
+    def running(self):
+        """
+        Whether the scheduler is currently calling its callback.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return not self._event is None
+    
+    @property
+    def achieved(self):
+        """
+        The number of frames per second in the last statistics window.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._achieved
+    
+    @property
+    def idle(self):
+        """
+        The fraction of the last statistics window that the process spent idle.
+        
+        This is one minus the processor time used by the process (all of its threads)
+        over the elapsed time.  Time spent spinning counts as busy.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._idle
+    
+    @property
+    def jitter(self):
+        """
+        The average time in seconds that a frame started after its deadline.
+        
+        This value is for the last statistics window.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._jitter
+    
+    @property
+    def skipped(self):
+        """
+        The number of frames skipped since the scheduler started.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._skipped
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,callback,fps=60.0,skip=True,throttle=True):
+        """
+        Creates, but does not start, a new frame scheduler.
+        
+        :param callback: The function to call each frame, given the time since the last
+        :type callback:  callable taking a ``float``
+        
+        :param fps: The target number of frames per second
+        :type fps:  ``int`` or ``float`` > 0
+        
+        :param skip: Whether to skip the frames missed when the game falls behind
+        :type skip:  ``bool``
+        
+        :param throttle: Whether to wait for the frame deadlines
+        :type throttle:  ``bool``
+        """
+        assert callable(callback), '%s is not callable' % repr(callback)
+        assert type(throttle) == bool, '%s is not a bool' % repr(throttle)
+        self._callback = callback
+        self._throttle = throttle
+        self._event   = None
+        self._calling = False
+        self.fps  = fps
+        self.skip = skip
+        
+        self._last     = 0.0
+        self._deadline = 0.0
+        self._skipped  = 0
+        self._achieved = 0.0
+        self._idle     = 1.0
+        self._jitter   = 0.0
+        self._maximum  = 0.0
+        self._start_window(time.perf_counter())
+    
+    
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Starts calling the callback, beginning with the next Kivy frame.
+        
+        Calling this method while the scheduler is running has no effect.
+        """
+        if self.running:
+            return
+        
+        now = time.perf_counter()
+        self._last     = now
+        self._deadline = now
+        self._start_window(now)
+        self._event = Clock.schedule_once(self._tick,0)
+    
+    def stop(self):
+        """
+        Stops calling the callback.
+        
+        Calling this method while the scheduler is stopped has no effect.
+        """
+        if self.running:
+            self._event.cancel()
+            self._event = None
+    
+    def stats(self):
+        """
+        Returns: A dictionary of statistics for this scheduler
+        
+        The dictionary has the keys 'fps' (the target), 'achieved', 'idle', 'jitter',
+        'jitter_max' (the latest start in the last window) and 'skipped'.
+        """
+        return {'fps': self._fps, 'achieved': self._achieved, 'idle': self._idle,
+                'jitter': self._jitter, 'jitter_max': self._maximum,
+                'skipped': self._skipped}
+    
+    
+    # HIDDEN METHODS
+    def _tick(self,dt):
+        """
+        Waits out the rest of the frame period and calls the callback.
+        
+        This method is called by the Kivy clock shortly before each deadline.
+        
+        :param dt: time in seconds since the Kivy clock was asked for this call
+        :type dt:  ``float``
+        """
+        remain = self._deadline-time.perf_counter()
+        if self._throttle and remain > self.SPIN_MARGIN:
+            time.sleep(remain-self.SPIN_MARGIN)
+        while self._throttle and time.perf_counter() < self._deadline:
+            pass
+        
+        now  = time.perf_counter()
+        late = now-self._deadline
+        self._late   += late
+        self._worst   = max(self._worst,late)
+        self._frames += 1
+        
+        delta = now-self._last
+        self._last = now
+        self._calling = True
+        try:
+            self._callback(delta)
+        finally:
+            self._calling = False
+        
+        after = time.perf_counter()
+        self._deadline += self._period
+        if not self._throttle:
+            self._deadline = after
+        elif self._skip and after-self._deadline > self._period:
+            missed = int((after-self._deadline)/self._period)
+            self._deadline += missed*self._period
+            self._skipped  += missed
+        
+        if after-self._window >= self.WINDOW:
+            self._end_window(after)
+        if self.running:
+            self._schedule(after)
+    
+    def _schedule(self,now):
+        """
+        Asks the Kivy clock to call :meth:`_tick` shortly before the next deadline.
+        
+        :param now: the current time
+        :type now:  ``float``
+        """
+        if not self._event is None:
+            self._event.cancel()
+        delay = max(self._deadline-now-self.CLOCK_MARGIN,0)
+        self._event = Clock.schedule_once(self._tick,delay)
+    
+    def _start_window(self,now):
+        """
+        Starts a new statistics window at the given time.
+        
+        :param now: the current time
+        :type now:  ``float``
+        """
+        self._window  = now
+        self._process = time.process_time()
+        self._frames  = 0
+        self._late    = 0.0
+        self._worst   = 0.0
+    
+    def _end_window(self,now):
+        """
+        Computes the statistics for the window ending at the given time.
+        
+        :param now: the current time
+        :type now:  ``float``
+        """
+        elapsed = now-self._window
+        busy = time.process_time()-self._process
+        self._achieved = self._frames/elapsed
+        self._idle     = min(max(1.0-busy/elapsed,0.0),1.0)
+        self._jitter   = self._late/self._frames if self._frames else 0.0
+        self._maximum  = self._worst
+        self._start_window(now)
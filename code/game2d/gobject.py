@@ -11,7 +11,15 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from cornell import Point2, Matrix
-import numpy as np
+import math
+
+# The shared color instructions, keyed by rgba tuple
+COLOR_TABLE = {}
+# The rgba tuple of each color string seen so far
+COLOR_NAMES = {}
+# The statistics for the color table
+COLOR_STATS = {'hits': 0, 'parses': 0}
+
 
 def is_color(c):
     """
@@ -32,12 +40,65 @@ def is_color(c):
         return True
     
     if type(c) in [tuple, list] and 3 <= len(c) <= 4:
-        from functools import reduce
-        return reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float] and 0 <= z <= 1, c))
+        return all(type(z) in [int, float] and 0 <= z <= 1 for z in c)
     
     return type(c) == str and cornell.is_tkcolor(c)
 
 
+def color_stats():
+    """
+    Returns: A dictionary of statistics for the shared color table
+    
+    The dictionary has the keys 'colors' (the number of distinct colors), 'parses' 
+    (the number of color strings parsed) and 'hits' (the number of parses saved, as
+    the string was already in the table).
+    """
+    result = dict(COLOR_STATS)
+    result['colors'] = len(COLOR_TABLE)
+    return result
+
+
+def _intern_color(value):
+    """
+    Returns: The shared Kivy ``Color`` instruction for the given color (or None)
+    
+    Color strings are parsed only the first time they are seen, and every object with 
+    the same color shares the same instruction.  Hence these instructions must never
+    be modified; to change the color of an object, assign it a new color.
+    
+    :param value: The color to convert
+    :type value:  ``None`` or any value satisfying :func:`is_color`
+    """
+    if value is None:
+        return None
+    
+    if type(value) == str:
+        key = COLOR_NAMES.get(value)
+        if key is None:
+            import cornell
+            assert is_color(value), '%s is not a valid color' % repr(value)
+            if value[0] == '#':
+                key = tuple(cornell.RGB.CreateWebColor(value).glColor())
+            else:
+                key = tuple(cornell.RGB.CreateName(value).glColor())
+            COLOR_NAMES[value] = key
+            COLOR_STATS['parses'] += 1
+        else:
+            COLOR_STATS['hits'] += 1
+    else:
+        assert is_color(value), '%s is not a valid color' % repr(value)
+        if type(value) in [tuple, list]:
+            key = tuple(float(x) for x in value)+((1.0,) if len(value) == 3 else ())
+        else:
+            key = tuple(value.glColor())
+    
+    color = COLOR_TABLE.get(key)
+    if color is None:
+        color = Color(key[0],key[1],key[2],key[3])
+        COLOR_TABLE[key] = color
+    return color
+
+
 def is_num_tuple(t,size):
     """
     Checks whether a value is a sequence of numbers.
@@ -54,8 +115,7 @@ def is_num_tuple(t,size):
     :type size:  ``int`` >= 0
     """
     try:
-        from functools import reduce
-        return len(t) == size and reduce(lambda x, y: x and y, map(lambda z: type(z) in [int, float], t))
+        return len(t) == size and all(type(z) in [int, float] for z in t)
     except:
         return False
 
@@ -71,12 +131,104 @@ def is_gobject_list(g):
     :type g:  any
     """
     try:
-        from functools import reduce
-        return len(g) >= 0 and reduce(lambda x, y: x and y, map(lambda z: isinstance(z,GObject), g))
+        return len(g) >= 0 and all(isinstance(z,GObject) for z in g)
     except:
         return False
 
 
+def set_transforms(objs,xs=None,ys=None,angles=None):
+    """
+    Sets the position and rotation of a group of objects at once.
+    
+    This function is equivalent to assigning the attributes ``x``, ``y`` and ``angle`` 
+    of each object in ``objs``, but it is much faster for large groups.  Each array is
+    validated once, instead of once per object, and the transforms are written directly.
+    Any of the arrays may be None, in which case that attribute is left unchanged.
+    
+    For example, to move a group of objects ten pixels to the right, use::
+        
+        set_transforms(objs,np.array([obj.x for obj in objs])+10)
+    
+    :param objs: The objects to transform
+    :type objs:  list or tuple of :class:`GObject`
+    
+    :param xs: The new horizontal coordinates, one per object
+    :type xs:  array-like of numbers with the same length as ``objs``, or None
+    
+    :param ys: The new vertical coordinates, one per object
+    :type ys:  array-like of numbers with the same length as ``objs``, or None
+    
+    :param angles: The new angles of rotation, in degrees, one per object
+    :type angles:  array-like of numbers with the same length as ``objs``, or None
+    """
+    assert is_gobject_list(objs), '%s is not a list of valid objects' % repr(objs)
+    xs = _as_coords(xs,len(objs))
+    ys = _as_coords(ys,len(objs))
+    angles = _as_coords(angles,len(objs))
+    
+    for obj in objs:
+        obj._snapshot()
+    if not xs is None:
+        for obj, x in zip(objs,xs):
+            obj._trans.x = x
+            if hasattr(obj,'_hanchor'):
+                obj._hanchor = 'center'
+                obj._ha = x
+    if not ys is None:
+        for obj, y in zip(objs,ys):
+            obj._trans.y = y
+            if hasattr(obj,'_vanchor'):
+                obj._vanchor = 'center'
+                obj._hv = y
+    if not angles is None:
+        for obj, angle in zip(objs,angles):
+            obj._rotate.angle = angle
+    for obj in objs:
+        obj._invalidate()
+
+
+def _as_coords(values,size):
+    """
+    Returns: The given values as a list of floats, or None if ``values`` is None
+    
+    This function validates an array passed to :func:`set_transforms`.  It is converted 
+    to a list, as Kivy instructions are faster to update with Python floats than with
+    NumPy scalars.
+    
+    :param values: The values to convert
+    :type values:  array-like of numbers, or None
+    
+    :param size: The required number of values
+    :type size:  ``int`` >= 0
+    """
+    if values is None:
+        return None
+    
+    import numpy as np
+    values = np.asarray(values,dtype=float)
+    assert values.shape == (size,), 'array of shape %s does not have %d values' % (repr(values.shape),size)
+    assert np.isfinite(values).all(), 'array %s has values that are not finite' % repr(values)
+    return values.tolist()
+
+
+def _as_points(points):
+    """
+    Returns: The given points as an (N,2) array of floats
+    
+    This function validates the points passed to a ``contains_many`` method.  A single
+    point is treated as an array of one point.
+    
+    :param points: The points to convert
+    :type points:  array-like of shape (N,2) or (2,)
+    """
+    import numpy as np
+    points = np.asarray(points,dtype=float)
+    if points.ndim == 1:
+        points = points.reshape(1,-1)
+    assert points.ndim == 2 and points.shape[1] == 2, 'array of shape %s is not a list of points' % repr(points.shape)
+    return points
+
+
 # #mark -
 
 class GObject(object):
@@ -90,6 +242,14 @@ class GObject(object):
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`, 
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
+    # The scene containing this object (or None); set by GScene
+    _parent = None
+    # Class attribute counting the changes to any object (to detect unchanged frames)
+    EPOCH = 0
+    # Class attribute counting the simulation ticks (set by GameApp)
+    TICK = 0
+    # Class attribute for the fraction of a tick to interpolate when drawing (set by GameApp)
+    ALPHA = 1.0
     
     # MUTABLE PROPERTIES 
     @property
@@ -104,8 +264,9 @@ class GObject(object):
     @x.setter
     def x(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._snapshot()
         self._trans.x = float(value)
-        self._mtrue = False
+        self._invalidate()
     
     @property
     def y(self):
@@ -119,8 +280,9 @@ class GObject(object):
     @y.setter
     def y(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._snapshot()
         self._trans.y = float(value)
-        self._mtrue = False
+        self._invalidate()
     
     @property
     def width(self):
@@ -138,6 +300,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
+        self._invalidate()
         if self._defined:
             self._reset()
     
@@ -157,6 +320,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
+        self._invalidate()
         if self._defined:
             self._reset()
     
@@ -188,7 +352,7 @@ class GObject(object):
         else:
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
-        self._mtrue = False
+        self._invalidate()
     
     @property
     def angle(self):
@@ -204,10 +368,11 @@ class GObject(object):
     @angle.setter
     def angle(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
+        diff = math.isclose(self._rotate.angle,value,rel_tol=1e-05,abs_tol=1e-08)
+        self._snapshot()
         self._rotate.angle = float(value)
         if not diff:
-            self._mtrue = False
+            self._invalidate()
     
     @property
     def linecolor(self):
@@ -230,19 +395,7 @@ class GObject(object):
     
     @linecolor.setter
     def linecolor(self,value):
-        import cornell
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [cornell.RGB, cornell.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = cornell.RGB.CreateWebColor(value).glColor()
-            else:
-                value = cornell.RGB.CreateName(value).glColor()
-        
-        self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._linecolor = _intern_color(value)
         if self._defined:
             self._reset()
             
@@ -268,19 +421,7 @@ class GObject(object):
     
     @fillcolor.setter
     def fillcolor(self,value):
-        import cornell
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [cornell.RGB, cornell.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = cornell.RGB.CreateWebColor(value).glColor()
-            else:
-                value = cornell.RGB.CreateName(value).glColor()
-        
-        self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._fillcolor = _intern_color(value)
         if self._defined:
             self._reset()
     
@@ -314,18 +455,9 @@ class GObject(object):
         Changing this value will shift the center of the object so that the left
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
-            return self.x-self.width/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return self._get_aabb()[0]
     
     @left.setter
     def left(self,value):
@@ -344,18 +476,9 @@ class GObject(object):
         Changing this value will shift the center of the object so that the right
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
-            return self.x+self.width/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return self._get_aabb()[2]
     
     @right.setter
     def right(self,value):
@@ -374,18 +497,9 @@ class GObject(object):
         Changing this value will shift the center of the object so that the top
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
-            return self.y+self.height/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return self._get_aabb()[3]
     
     @top.setter
     def top(self,value):
@@ -405,18 +519,9 @@ class GObject(object):
         Changing this value will shift the center of the object so that the bottom
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        if self._rotate.angle == 0.0:
-            return self.y-self.height/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return self._get_aabb()[1]
     
     
     @bottom.setter
@@ -427,6 +532,20 @@ class GObject(object):
     
     
     # IMMUTABLE PROPERTIES
+    @property
+    def bounds(self):
+        """
+        The axis-aligned bounding box of this shape.
+        
+        The value is the tuple (left,bottom,right,top).  It is cached, and only computed
+        again after the object is moved, rotated, scaled or resized.  Hence reading it 
+        (or the attributes ``left``, ``right``, ``top`` and ``bottom``) is fast, even for 
+        a rotated object.  This makes it ideal for quickly ruling out collisions.
+        
+        **invariant**: Value must be a 4-element tuple of ``float``.
+        """
+        return self._get_aabb()
+    
     @property
     def matrix(self):
         """
@@ -479,12 +598,21 @@ class GObject(object):
         """
         # Set the properties.
         self._defined = False
+        self._mtrue  = False
+        self._matrix = None
+        self._aabb   = None
+        self._tick   = -1
+        self._prev   = None
         
         # Create the Kivy transforms for position and size
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
         
+        # The offsets from the current transform to the interpolated one
+        self._ilerp  = Translate(0,0,0)
+        self._ispin  = Rotate(angle=0,axis=(0,0,1))
+        
         # Now update these with the keywords; size first
         try:
             self.width  = keywords['width']  if 'width'  in keywords else 1
@@ -517,6 +645,9 @@ class GObject(object):
         
         # Add a name for debugging
         self.name = keywords['name'] if 'name' in keywords else None
+        
+        # A new object starts where it is placed, not at the origin
+        self._tick = -1
     
     def __str__(self):
         """
@@ -560,8 +691,31 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
         
-        p = list(self.matrix.inverse()._transform(point[0],point[1]))
-        return abs(list(p)[0]) < self.width/2.0 and abs(list(p)[1]) < self.height/2.0
+        p = self.inverse._transform(point[0],point[1])
+        return abs(p[0]) < self.width/2.0 and abs(p[1]) < self.height/2.0
+    
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+        
+        This method is the same as calling :meth:`contains` on each point, except that
+        the points are tested all at once.  It is much faster for testing the corners of 
+        another shape, or a lot of bullets, as the inverse transform is only computed 
+        once (when the object moves).
+        
+        :param points: the points to check
+        :type points: NumPy array of shape (N,2), or a sequence of pairs of numbers
+        
+        :return: An array whose i-th value is True if the shape contains the i-th point
+        :rtype:  NumPy array of ``bool`` with shape (N,)
+        """
+        points = _as_points(points)
+        if self._rotate.angle == 0.0:
+            return (abs(points[:,0]-self.x) < self.width/2.0) & \
+                   (abs(points[:,1]-self.y) < self.height/2.0)
+        
+        local = self._local_points(points)
+        return (abs(local[:,0]) < self.width/2.0) & (abs(local[:,1]) < self.height/2.0)
     
     def transform(self,point):
         """
@@ -582,34 +736,105 @@ class GObject(object):
             return self.inverse.transform(point)
         else:
             assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
+            p = self.inverse._transform(point[0],point[1])
             return Point2(p[0],p[1])
     
-    def draw(self, view):
+    def draw(self, view, layer=None):
         """
         Draws this shape in the provide view.
         
-        Ideally, the view should be the one provided by :class:`GameApp`.
+        Ideally, the view should be the one provided by :class:`GameApp`.  The shape is
+        drawn in the given layer of the view, or the layer 'default' if there is none.
+        See :class:`GView` for more information on layers.
+        
+        If the game has a ``tick_rate``, a shape that moved in the last simulation tick
+        is drawn part of the way between its previous and current position and angle.
+        This does not change the attributes of the shape.
         
         :param view: view to draw to
         :type view:  :class:`GView`
+        
+        :param layer: the name of the layer to draw in
+        :type layer:  ``str`` or ``None``
         """
+        if hasattr(view,'draw_object'):
+            # A software view rasterizes the object itself
+            view.draw_object(self)
+            return
+        
         try:
-            view.draw(self._cache)
+            cache = self._cache
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
+        
+        self._interpolate()
+        if layer is None:
+            view.draw(cache)
+        else:
+            view.draw(cache,layer)
     
     # HIDDEN METHODS
     def _reset(self):
         """
         Resets the drawing cache.
         """
+        GObject.EPOCH += 1
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
+        self._cache.add(self._ilerp)
         self._cache.add(self._trans)
+        self._cache.add(self._ispin)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
     
+    def _snapshot(self):
+        """
+        Records the transform of this object before its first change in this tick.
+        
+        This method must be called before changing the position or angle.  The values
+        recorded are the start point for :meth:`_interpolate`.
+        """
+        if self._tick != GObject.TICK:
+            self._tick = GObject.TICK
+            self._prev = (self._trans.x,self._trans.y,self._rotate.angle)
+    
+    def _interpolate(self):
+        """
+        Sets the interpolation offsets for the current value of ``ALPHA``.
+        
+        An object that did not move in the last tick has no offsets.  Otherwise, the
+        offsets move it back from the current transform by 1-``ALPHA`` of its motion
+        in that tick.
+        """
+        dx = dy = da = 0.0
+        if self._tick == GObject.TICK and GObject.ALPHA < 1.0:
+            t = GObject.ALPHA-1.0
+            px, py, pa = self._prev
+            dx = t*(self._trans.x-px)
+            dy = t*(self._trans.y-py)
+            da = t*(self._rotate.angle-pa)
+        
+        if dx != self._ilerp.x or dy != self._ilerp.y:
+            self._ilerp.x = dx
+            self._ilerp.y = dy
+            GObject.EPOCH += 1
+        if da != self._ispin.angle:
+            self._ispin.angle = da
+            GObject.EPOCH += 1
+    
+    def _invalidate(self):
+        """
+        Marks the transform of this object as changed.
+        
+        The matrices and bounding box are rebuilt the next time they are needed.  If 
+        this object is in a scene, the cached bounds of that scene (and every scene 
+        above it) are discarded as well.
+        """
+        GObject.EPOCH += 1
+        self._mtrue = False
+        if not self._parent is None:
+            self._parent._refit()
+    
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
@@ -622,11 +847,132 @@ class GObject(object):
         self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
         self._invrse.rotate(-self._rotate.angle)
         self._invrse.translate(-self._trans.x,-self._trans.y)
+        
+        # The inverse as the rows of a 2x3 affine matrix, for transforming many points
+        radians = math.radians(self._rotate.angle)
+        a =  math.cos(radians)/self._scale.x
+        b =  math.sin(radians)/self._scale.x
+        c = -math.sin(radians)/self._scale.y
+        d =  math.cos(radians)/self._scale.y
+        tx, ty = self._trans.x, self._trans.y
+        self._affine = ((a,b,-a*tx-b*ty),(c,d,-c*tx-d*ty))
+        self._affarray = None
         self._mtrue = True
+        self._aabb  = None
+    
+    def _local_points(self,points):
+        """
+        Returns: The given points transformed to the local coordinate system
+        
+        This is the vectorized version of :meth:`transform`, using the cached inverse.
+        
+        :param points: the points to transform
+        :type points:  NumPy array of shape (N,2)
+        """
+        import numpy as np
+        if not self._mtrue or self._matrix is None:
+            self._build_matrix()
+        if self._affarray is None:
+            self._affarray = np.array(self._affine)
+        return np.dot(points,self._affarray[:,:2].T)+self._affarray[:,2]
+    
+    def _get_aabb(self):
+        """
+        Returns: The (cached) bounding box (left,bottom,right,top) of this shape
+        
+        The box is computed again only if the transform changed since the last call.
+        If rotation is 0, the box is centered at (x,y) with the scaled width and height.
+        Otherwise, it is the smallest box containing the scaled and rotated rectangle.
+        """
+        if not self._mtrue or self._matrix is None:
+            self._build_matrix()
+        if self._aabb is None:
+            w = self.width*abs(self._scale.x)/2.0
+            h = self.height*abs(self._scale.y)/2.0
+            if self._rotate.angle != 0.0:
+                radians = math.radians(self._rotate.angle)
+                cos = abs(math.cos(radians))
+                sin = abs(math.sin(radians))
+                w, h = w*cos+h*sin, w*sin+h*cos
+            x = self._trans.x
+            y = self._trans.y
+            self._aabb = (x-w,y-h,x+w,y+h)
+        return self._aabb
 
 
 # #mark -
 
+class _QuadTree(object):
+    """
+    A hidden class for a quadtree of bounding boxes.
+    
+    Each node splits its box into four quadrants.  A box that fits entirely in one
+    quadrant is pushed down to that child; a box straddling a quadrant boundary stays
+    at the node.  The tree is immutable: a scene builds a new one when its children
+    move.
+    """
+    # The number of boxes a node can hold before it splits
+    CAPACITY  = 8
+    # The maximum depth of the tree
+    MAX_DEPTH = 8
+    
+    def __init__(self,box,items,depth=0):
+        """
+        Creates a quadtree node for the given items.
+        
+        :param box: The region (left,bottom,right,top) covered by this node
+        :type box:  4-element tuple of ``float``
+        
+        :param items: The (index, box) pairs to store in this node
+        :type items:  ``list`` of pairs
+        
+        :param depth: The depth of this node
+        :type depth:  ``int`` >= 0
+        """
+        self._box = box
+        self._items = items
+        self._nodes = None
+        if len(items) <= _QuadTree.CAPACITY or depth >= _QuadTree.MAX_DEPTH:
+            return
+        
+        cx = (box[0]+box[2])/2.0
+        cy = (box[1]+box[3])/2.0
+        quads = ((box[0],box[1],cx,cy),(cx,box[1],box[2],cy),
+                 (box[0],cy,cx,box[3]),(cx,cy,box[2],box[3]))
+        parts = ([],[],[],[])
+        self._items = []
+        for item in items:
+            b = item[1]
+            if b[2] <= cx:
+                q = 0 if b[3] <= cy else (2 if b[1] >= cy else -1)
+            elif b[0] >= cx:
+                q = 1 if b[3] <= cy else (3 if b[1] >= cy else -1)
+            else:
+                q = -1
+            if q == -1:
+                self._items.append(item)
+            else:
+                parts[q].append(item)
+        self._nodes = [_QuadTree(quads[q],parts[q],depth+1) for q in range(4) if parts[q]]
+    
+    def query(self,left,bottom,right,top,result):
+        """
+        Adds the index of every box overlapping the region to ``result``.
+        
+        :param result: The list to add the indices to
+        :type result:  ``list``
+        """
+        for index, b in self._items:
+            if b[0] <= right and left <= b[2] and b[1] <= top and bottom <= b[3]:
+                result.append(index)
+        if self._nodes:
+            for node in self._nodes:
+                b = node._box
+                if b[0] <= right and left <= b[2] and b[1] <= top and bottom <= b[3]:
+                    node.query(left,bottom,right,top,result)
+
+
+# #mark -
 class GScene(GObject):
     """
     A class representing a node in a scene graph.
@@ -640,9 +986,19 @@ class GScene(GObject):
     
     The attributes ``width`` and ``height`` are present in this object, but they are now
     read-only.  These values are computed from the list of objects stored in the scene.
+    They are cached, and only computed again after a child (or a child of a child) is
+    moved, resized or rotated.
+    
+    If the attribute ``quadtree`` is True, the scene also keeps a quadtree of the 
+    bounding boxes of its children.  This makes :meth:`select` and :meth:`query` 
+    logarithmic instead of linear, which matters for scenes with thousands of objects.
+    The tree is rebuilt (on the next selection or query) whenever a child moves, so it 
+    is best used for children that do not move every frame.
     
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
     """
+    # The number of children before a quadtree is actually built
+    QUADTREE_MIN = 16
     
     # MUTABLE PROPERTIES
     @property
@@ -660,10 +1016,35 @@ class GScene(GObject):
     @children.setter
     def children(self,value):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        for child in getattr(self,'_children',[]):
+            if child._parent is self:
+                child._parent = None
         self._children = list(value)
+        for child in self._children:
+            child._parent = self
+        self._content = None
+        self._tree = None
+        self._invalidate()
         if self._defined:
             self._reset()
     
+    @property
+    def quadtree(self):
+        """
+        Whether this scene keeps a quadtree of its children.
+        
+        The quadtree is only built if the scene has at least ``QUADTREE_MIN`` children.
+        
+        **invariant**: Value must be a ``bool``
+        """
+        return self._quad
+    
+    @quadtree.setter
+    def quadtree(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._quad = value
+        self._tree = None
+    
     
     # IMMUTABLE PROPERTIES
     @property
@@ -676,12 +1057,8 @@ class GScene(GObject):
         
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """ 
-        max = 0
-        for x in self.children:
-            w = x.x+x.width/2.0
-            if w > max:
-                max = w
-        return max*2
+        box = self._get_content()
+        return 2*max(-box[0],box[2],0)
     
     @property
     def height(self):
@@ -693,12 +1070,8 @@ class GScene(GObject):
         
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """ 
-        max = 0
-        for x in self.children:
-            h = x.y+x.height/2.0
-            if h > max:
-                max = h
-        return max*2
+        box = self._get_content()
+        return 2*max(-box[1],box[3],0)
     
     
     # BUILT-IN METHODS
@@ -713,13 +1086,16 @@ class GScene(GObject):
             GScene(children=[rect,tri,circ])
         
         This class supports the same keywords as :class:`GObject`, though some of them 
-        are unused, as the `width` and `height` attributes are now immutable.
+        are unused, as the `width` and `height` attributes are now immutable.  It also
+        supports the keyword ``quadtree`` (which is False by default).
         
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._quad = False
         self.children = keywords['children'] if 'children' in keywords else []
+        self.quadtree = keywords['quadtree'] if 'quadtree' in keywords else False
         GObject.__init__(self,**keywords)
         self._reset()
         self._defined = True
@@ -734,8 +1110,9 @@ class GScene(GObject):
         it finds that contains ``point``.  If that child is also a ``GScene``, it 
         recursively calls this method.  If not child contains this point, it returns
         either this object, or ``None`` if the point is completely out of bounds.
-       
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        
+        Children whose bounding box does not contain the point are skipped without a
+        full test.  With a quadtree, they are not even visited.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
@@ -743,19 +1120,103 @@ class GScene(GObject):
         if not self.contains(point):
             return None
         
-        for child in self._children:
-            result = None
+        local = self.transform(point)
+        for child in self._candidates(local.x,local.y,local.x,local.y):
             if isinstance(child,GScene):
-                result = child.select(point)
-            elif child.contains(point):
+                result = child.select(local)
+            elif child.contains(local):
                 result = child
-            if not child is None:
-                return child
+            else:
+                result = None
+            if not result is None:
+                return result
         
-        return None
+        return self
+    
+    def query(self,left,bottom,right,top):
+        """
+        Returns: The children whose bounding box overlaps the given region
+        
+        The region is given in the coordinate system of this scene (the same as the 
+        children, with (x,y) as the origin).  The children are returned in drawing 
+        order.  This method does not descend into child scenes.
+        
+        :param left: The left edge of the region
+        :type left:  ``int`` or ``float``
+        
+        :param bottom: The bottom edge of the region
+        :type bottom:  ``int`` or ``float``
+        
+        :param right: The right edge of the region
+        :type right:  ``int`` or ``float`` >= left
+        
+        :param top: The top edge of the region
+        :type top:  ``int`` or ``float`` >= bottom
+        """
+        assert is_num_tuple((left,bottom,right,top),4), '%s is not a valid region' % repr((left,bottom,right,top))
+        assert left <= right and bottom <= top, '%s is not a valid region' % repr((left,bottom,right,top))
+        return self._candidates(left,bottom,right,top)
     
     
     # HIDDEN METHODS
+    def _refit(self):
+        """
+        Discards the cached bounds after a child changed.
+        
+        The change is passed up to the scene containing this one.  If the bounds were 
+        already discarded, then so were the bounds of every scene above this one.
+        """
+        if self._content is None:
+            return
+        self._content = None
+        self._tree = None
+        self._aabb = None
+        if not self._parent is None:
+            self._parent._refit()
+    
+    def _get_content(self):
+        """
+        Returns: The (cached) box (left,bottom,right,top) containing all children
+        
+        The box is in the coordinate system of this scene.  An empty scene has the
+        empty box at the origin.
+        """
+        if self._content is None:
+            boxes = [child._get_aabb() for child in self._children]
+            if boxes:
+                self._content = (min(b[0] for b in boxes),min(b[1] for b in boxes),
+                                 max(b[2] for b in boxes),max(b[3] for b in boxes))
+            else:
+                self._content = (0.0,0.0,0.0,0.0)
+        return self._content
+    
+    def _candidates(self,left,bottom,right,top):
+        """
+        Returns: The children (in order) whose bounding box overlaps the region
+        
+        This uses the quadtree if there is one.  The region is in the coordinate 
+        system of this scene.
+        """
+        box = self._get_content()
+        if box[0] > right or left > box[2] or box[1] > top or bottom > box[3]:
+            return []
+        
+        if self._quad and len(self._children) >= GScene.QUADTREE_MIN:
+            if self._tree is None:
+                items = [(i,child._get_aabb()) for i, child in enumerate(self._children)]
+                self._tree = _QuadTree(box,items)
+            indices = []
+            self._tree.query(left,bottom,right,top,indices)
+            indices.sort()
+            return [self._children[i] for i in indices]
+        
+        result = []
+        for child in self._children:
+            b = child._get_aabb()
+            if b[0] <= right and left <= b[2] and b[1] <= top and bottom <= b[3]:
+                result.append(child)
+        return result
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -763,4 +1224,12 @@ class GScene(GObject):
         GObject._reset(self)
         for x in self.children:
             self._cache.add(x._cache)
-        self._cache.add(PopMatrix())
\ No newline at end of file
+        self._cache.add(PopMatrix())
+    
+    def _interpolate(self):
+        """
+        Sets the interpolation offsets of this scene and all of its children.
+        """
+        GObject._interpolate(self)
+        for x in self.children:
+            x._interpolate()
@@ -0,0 +1,244 @@
+"""
+A module to support particle effects.
+
+This module supports short-lived animations, such as explosions, that are spawned
+in large numbers.  Instead of making a sprite for each effect, the effects in a
+particle system share a single filmstrip, and their state is kept in arrays.  Every
+animation frame, the arrays are updated all at once and the effects are drawn as a
+single mesh.  So a hundred explosions cost about the same as one.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+
+
+# #mark -
+class GParticles(GObject):
+    """
+    A class representing a group of animated effects sharing one filmstrip.
+    
+    The filmstrip is given by the attributes ``source`` and ``format`` as in
+    :class:`GSprite`.  Each effect plays the frames ``first`` to ``last`` of the
+    filmstrip, showing each frame for ``frame_time`` seconds, and is then removed.
+    Effects are created with :meth:`spawn` or :meth:`spawn_many` and animated with
+    :meth:`update`.
+    
+    The position of each effect is relative to the position (x,y) of this object,
+    which is (0,0) by default.  The attributes ``width`` and ``height`` are the size
+    of a single effect.  If you define ``fillcolor``, the effects are tinted by it.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The filmstrip file for the effects.
+        
+        **Immutable**: This value cannot be changed after the object is created.
+        
+        **Invariant**: Must be a string refering to a valid file.
+        """
+        return self._source
+    
+    @property
+    def frames(self):
+        """
+        The first and last frame of the animation.
+        
+        **Immutable**: This value cannot be changed after the object is created.
+        
+        **Invariant**: Must be a pair of ints with 0 <= first <= last < rows*columns.
+        """
+        return (self._first,self._last)
+    
+    @property
+    def frame_time(self):
+        """
+        The number of seconds each frame of the animation is shown.
+        
+        **Immutable**: This value cannot be changed after the object is created.
+        
+        **Invariant**: Must be a float > 0.
+        """
+        return self._ftime
+    
+    @property
+    def count(self):
+        """
+        The number of effects currently playing.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._count
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty particle system.
+        
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to play
+        frames 2 to 5 of the filmstrip ``alien-strip1.png``, which has 3 rows and 2
+        columns, at 20 frames a second, use the constructor::
+            
+            GParticles(source='alien-strip1.png',format=(3,2),frames=(2,5),
+                       frame_time=0.05,width=33,height=33)
+        
+        This class supports the same keywords as :class:`GObject`, plus ``source``,
+        ``format``, ``frames`` (all frames by default), ``frame_time`` (1/60 by default)
+        and ``capacity`` (the number of effects to make room for initially).
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        import numpy as np
+        from .gsprite import GSprite
+        self._defined = False
+        self._source = keywords['source'] if 'source' in keywords else None
+        format = keywords['format'] if 'format' in keywords else (1,1)
+        first, last = keywords['frames'] if 'frames' in keywords else (0,format[0]*format[1]-1)
+        self._ftime = float(keywords['frame_time'] if 'frame_time' in keywords else 1/60.0)
+        capacity = keywords['capacity'] if 'capacity' in keywords else 16
+        
+        assert GameApp.is_image(self._source), '%s is not an image file' % repr(self._source)
+        assert type(format) == tuple and len(format) == 2 and format[0] > 0 and format[1] > 0, \
+                '%s is not a valid format' % repr(format)
+        assert 0 <= first <= last < format[0]*format[1], '%s are not valid frames' % repr((first,last))
+        assert self._ftime > 0, '%s is not a valid frame time' % repr(self._ftime)
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._format = format
+        self._first  = first
+        self._last   = last
+        
+        # The texture coordinates of each frame, in vertex order
+        regions = GSprite._load_frames(self._source,format)
+        self._texture = None if not regions else regions[0].owner
+        self._uvs = np.zeros((format[0]*format[1],4,2))
+        if regions:
+            for i, region in enumerate(regions):
+                self._uvs[i] = np.reshape(region.tex_coords,(4,2))
+        
+        self._count = 0
+        self._pos = np.zeros((capacity,2))
+        self._age = np.zeros(capacity)
+        self._mesh = Mesh(vertices=[],indices=[],mode='triangles',texture=self._texture)
+        
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+    
+    
+    # PUBLIC METHODS
+    def spawn(self,x,y):
+        """
+        Starts a new effect centered at (x,y).
+        
+        :param x: the horizontal coordinate of the effect center
+        :type x:  ``int`` or ``float``
+        
+        :param y: the vertical coordinate of the effect center
+        :type y:  ``int`` or ``float``
+        """
+        self.spawn_many((x,),(y,))
+    
+    def spawn_many(self,xs,ys):
+        """
+        Starts a new effect at each of the given positions.
+        
+        :param xs: the horizontal coordinates of the effect centers
+        :type xs:  array-like of numbers
+        
+        :param ys: the vertical coordinates of the effect centers
+        :type ys:  array-like of numbers with the same length as ``xs``
+        """
+        import numpy as np
+        xs = np.asarray(xs,dtype=float).ravel()
+        ys = np.asarray(ys,dtype=float).ravel()
+        assert xs.shape == ys.shape, 'coordinates %s and %s do not match' % (repr(xs),repr(ys))
+        total = self._count+len(xs)
+        if total > len(self._age):
+            size = max(total,2*len(self._age))
+            self._pos = np.resize(self._pos,(size,2))
+            self._age = np.resize(self._age,size)
+        
+        self._pos[self._count:total,0] = xs
+        self._pos[self._count:total,1] = ys
+        self._age[self._count:total] = 0.0
+        self._count = total
+        self._layout()
+    
+    def update(self,dt):
+        """
+        Advances every effect by the given time, removing those that have finished.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        if self._count == 0:
+            return
+        
+        n = self._count
+        self._age[:n] += dt
+        alive = self._age[:n] < (self._last-self._first+1)*self._ftime
+        if not alive.all():
+            self._count = int(alive.sum())
+            self._pos[:self._count] = self._pos[:n][alive]
+            self._age[:self._count] = self._age[:n][alive]
+        self._layout()
+    
+    def clear(self):
+        """
+        Removes every effect.
+        """
+        self._count = 0
+        self._layout()
+    
+    def current_frames(self):
+        """
+        Returns: The filmstrip frame of each effect playing (as a NumPy array of ints)
+        """
+        import numpy as np
+        frames = (self._age[:self._count]/self._ftime).astype(int)+self._first
+        return np.minimum(frames,self._last)
+    
+    def positions(self):
+        """
+        Returns: The center of each effect playing (as a NumPy array of shape (N,2))
+        """
+        return self._pos[:self._count]
+    
+    
+    # HIDDEN METHODS
+    def _layout(self):
+        """
+        Rewrites the mesh vertices for the effects playing.
+        """
+        import numpy as np
+        GObject.EPOCH += 1
+        n = self._count
+        w = self.width/2.0
+        h = self.height/2.0
+        corners = np.array(((-w,-h),(w,-h),(w,h),(-w,h)))
+        
+        vertices = np.empty((n,4,4))
+        vertices[:,:,:2] = self._pos[:n,None,:]+corners
+        vertices[:,:,2:] = self._uvs[self.current_frames()]
+        indices = (np.arange(n)[:,None]*4+np.array((0,1,2,2,3,0))).ravel()
+        self._mesh.vertices = vertices.ravel().tolist()
+        self._mesh.indices  = indices.tolist()
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
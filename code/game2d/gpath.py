@@ -10,7 +10,7 @@ Date:   August 1, 2017 (Python 3 version)
 # Lower-level kivy modules to support animation
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from .gobject import GObject
+from .gobject import GObject, Point2, _as_points
 
 
 def same_side(p1, p2, a, b):
@@ -32,11 +32,11 @@ def same_side(p1, p2, a, b):
     :return: True if ``p1``, ``p2`` are on the same side of segment ``ba``; False otherwise
     :rtype:  ``bool``
     """
-    import numpy as np
-    ba  = np.append(np.subtract(b,a),[0])
-    cp1 = np.cross(ba,np.subtract(p1,a))
-    cp2 = np.cross(ba,np.subtract(p2,a))
-    return np.dot(cp1,cp2) >= 0
+    bx = b[0]-a[0]
+    by = b[1]-a[1]
+    cp1 = bx*(p1[1]-a[1])-by*(p1[0]-a[0])
+    cp2 = bx*(p2[1]-a[1])-by*(p2[0]-a[0])
+    return cp1*cp2 >= 0
 
 
 def in_triangle(p, t):
@@ -82,6 +82,60 @@ def is_point_tuple(t,minsize):
         return False
 
 
+def _half_planes(triangles):
+    """
+    Returns: The edge normals and offsets of the given triangles
+    
+    Each triangle is turned counter-clockwise, and each edge (p,q) becomes the inward
+    normal n = (p[1]-q[1],q[0]-p[0]) and the offset n.p.  A point x is then in the 
+    triangle if and only if n.x >= n.p for all three edges.  Degenerate triangles 
+    (with no area) are dropped, as they contain no points.
+    
+    The result is a pair of arrays, of shape (T,3,2) and (T,3) respectively.
+    
+    :param triangles: The triangles to convert
+    :type triangles:  NumPy array of shape (T,3,2)
+    """
+    import numpy as np
+    a = triangles[:,0]
+    b = triangles[:,1]
+    c = triangles[:,2]
+    area = (b[:,0]-a[:,0])*(c[:,1]-a[:,1])-(b[:,1]-a[:,1])*(c[:,0]-a[:,0])
+    keep = np.abs(area) > 1e-12
+    flip = area[keep] < 0
+    triangles = triangles[keep]
+    triangles[flip] = triangles[flip][:,::-1]
+    
+    p = triangles
+    q = np.roll(triangles,-1,axis=1)
+    normals = np.stack((p[:,:,1]-q[:,:,1],q[:,:,0]-p[:,:,0]),axis=2)
+    offsets = (normals*p).sum(axis=2)
+    return normals, offsets
+
+
+def _in_half_planes(points,normals,offsets):
+    """
+    Returns: An array whose i-th value is True if the i-th point is in a triangle
+    
+    The triangles are given as by :func:`_half_planes`.  Points on an edge are in the 
+    triangle.
+    
+    :param points: The points to test
+    :type points:  NumPy array of shape (N,2)
+    
+    :param normals: The inward edge normals of each triangle
+    :type normals:  NumPy array of shape (T,3,2)
+    
+    :param offsets: The edge offsets of each triangle
+    :type offsets:  NumPy array of shape (T,3)
+    """
+    import numpy as np
+    if len(normals) == 0:
+        return np.zeros(len(points),dtype=bool)
+    tests = np.einsum('nk,tek->nte',points,normals) >= offsets-1e-9
+    return tests.all(axis=2).any(axis=1)
+
+
 # #mark -
 class GPath(GObject):
     """
@@ -119,6 +173,7 @@ class GPath(GObject):
     def points(self,value):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
+        self._invalidate()
         if self._defined:
             self._reset()
     
@@ -226,13 +281,14 @@ class GPath(GObject):
         :return: True if this path is near the give point; False otherwise.
         :rtype:  ``bool``
         """
+        import numpy as np
         if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_point_tuple(point,1),'value %s is not a valid point' %  repr(point)
         x = point[0]
         y = point[1]
         
-        size = len(self.points)/2
+        size = len(self.points)//2
         epsilon = 1e-6
         for ii in range(size-1):
             p = self.points[2*ii  :2*ii+2]
@@ -294,9 +350,13 @@ class GTriangle(GPath):
     
     @points.setter
     def points(self,value):
+        import numpy as np
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
+        triangle = np.array(self._points,dtype=float).reshape(1,3,2)
+        self._normals, self._offsets = _half_planes(triangle)
+        self._invalidate()
         if self._defined:
             self._reset()
     
@@ -331,9 +391,8 @@ class GTriangle(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        The point is transformed to the local coordinate system and then tested 
+        against the edges of the triangle, as in :meth:`contains_many`.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
@@ -345,7 +404,23 @@ class GTriangle(GPath):
             point = (point.x,point.y)
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
         
-        return in_triangle(points,self._points)
+        return bool(self.contains_many(point)[0])
+    
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+        
+        The edge normals of the triangle are computed when the points are set, so this
+        method is a few vectorized dot products.
+        
+        :param points: the points to check
+        :type points: NumPy array of shape (N,2), or a sequence of pairs of numbers
+        
+        :return: An array whose i-th value is True if the shape contains the i-th point
+        :rtype:  NumPy array of ``bool`` with shape (N,)
+        """
+        local = self._local_points(_as_points(points))
+        return _in_half_planes(local,self._normals,self._offsets)
     
     
     # HIDDEN METHODS
@@ -411,8 +486,15 @@ class GPolygon(GPath):
     
     @points.setter
     def points(self,value):
+        import numpy as np
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
+        
+        # Triangulate as a fan about the origin (the same as the mesh)
+        verts = np.array(self._points,dtype=float).reshape(-1,2)
+        fan = np.stack((np.zeros_like(verts),verts,np.roll(verts,-1,axis=0)),axis=1)
+        self._normals, self._offsets = _half_planes(fan)
+        self._invalidate()
         if self._defined:
             self._reset()
     
@@ -517,9 +599,8 @@ class GPolygon(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        The point is tested against the triangles of the polygon, as in 
+        :meth:`contains_many`.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
@@ -531,12 +612,25 @@ class GPolygon(GPath):
             point = (point.x,point.y)
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
         
-        found = False
-        for i in xrange(4,len(self._points),2):
-            t = (0,0)+self.points[i-4:i]
-            found = found or in_triangle(point,t)
+        return bool(self.contains_many(point)[0])
+    
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+        
+        This method tests every point against every triangle of the polygon fan (the
+        same triangles drawn by the mesh) at once.  The points are first transformed to
+        the local coordinate system, so it works for polygons that are moved or rotated.
+        The triangles and their edge normals are computed when the points are set.
         
-        return found
+        :param points: the points to check
+        :type points: NumPy array of shape (N,2), or a sequence of pairs of numbers
+        
+        :return: An array whose i-th value is True if the shape contains the i-th point
+        :rtype:  NumPy array of ``bool`` with shape (N,)
+        """
+        local = self._local_points(_as_points(points))
+        return _in_half_planes(local,self._normals,self._offsets)
     
     
     # HIDDEN METHODS
@@ -544,7 +638,7 @@ class GPolygon(GPath):
         """
         Creates the mesh for this polygon
         """
-        size = len(self.points)/2
+        size = len(self.points)//2
         try:
             texture = Image(source=self.source).texture
             texture.wrap = 'repeat'
@@ -10,10 +10,9 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
-from kivy.uix.image import Image
-from .gobject import GObject
+from .gobject import GObject, Point2, is_num_tuple, _as_points
 from .app import GameApp
+from collections import OrderedDict
 
 class GRectangle(GObject):
     """
@@ -142,9 +141,9 @@ class GEllipse(GRectangle):
         **Warning**: Using this method on a rotated object may slow down your framerate.
         
         :param point: the point to check
-        :type point: :class:`GPoint`` or a pair of numbers
+        :type point: :class:`Point2`` or a pair of numbers
         """
-        if isinstance(point,GPoint):
+        if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
         
@@ -154,12 +153,33 @@ class GEllipse(GRectangle):
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
+            p = self.inverse._transform(point[0],point[1])
             dx = p[0]*p[0]/(rx*rx)
             dy = p[1]*p[1]/(ry*ry)
         
         return (dx+dy) <= 1.0
     
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+        
+        This method is the vectorized version of :meth:`contains`.
+        
+        :param points: the points to check
+        :type points: NumPy array of shape (N,2), or a sequence of pairs of numbers
+        
+        :return: An array whose i-th value is True if the shape contains the i-th point
+        :rtype:  NumPy array of ``bool`` with shape (N,)
+        """
+        points = _as_points(points)
+        if self._rotate.angle == 0.0:
+            local = points-(self.x,self.y)
+        else:
+            local = self._local_points(points)
+        
+        local = local/(self.width/2.0,self.height/2.0)
+        return (local*local).sum(axis=1) <= 1.0
+    
     
     # HIDDEN METHODS
     def _reset(self):
@@ -296,7 +316,17 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Rendered text is shared between labels.  Two labels with the same text, font, point
+    size, boldness and color use the same texture, and the text is only rendered the 
+    first time it is used."""
+    # Class attribute for sharing rendered text (in least recently used order)
+    TEXT_CACHE = OrderedDict()
+    # The maximum number of rendered texts to keep in the cache
+    TEXT_CACHE_SIZE = 64
+    # Class attribute for tracking the performance of the text cache
+    TEXT_STATS = {'hits':0, 'misses':0, 'evictions':0}
     
     # MUTABLE PROPERTIES
     @property
@@ -311,8 +341,8 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        if self._defined:
+            self._reset()
     
     @property
     def font_name(self):
@@ -320,14 +350,15 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        if self._defined:
+            self._reset()
     
     @property
     def bold(self):
@@ -339,13 +370,14 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        if self._defined:
+            self._reset()
 
     @property
     def text(self):
@@ -357,13 +389,14 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        if self._defined:
+            self._reset()
     
     @property
     def halign(self):
@@ -385,7 +418,6 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
         if self._defined:
             self._reset()
     
@@ -409,7 +441,6 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
         if self._defined:
             self._reset()
     
@@ -426,8 +457,9 @@ class GLabel(GRectangle):
     @x.setter
     def x(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._snapshot()
         self._trans.x = float(value)
-        self._mtrue = False
+        self._invalidate()
         self._hanchor = 'center'
         self._ha = value
     
@@ -442,8 +474,9 @@ class GLabel(GRectangle):
     @y.setter
     def y(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._snapshot()
         self._trans.y = float(value)
-        self._mtrue = False
+        self._invalidate()
         self._vanchor = 'center'
         self._hv = value
     
@@ -458,18 +491,9 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the left
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
-            return self.x-self.width/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return self._get_aabb()[0]
     
     @left.setter
     def left(self,value):
@@ -490,18 +514,9 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the right
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
-            return self.x+self.width/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return self._get_aabb()[2]
     
     @right.setter
     def right(self,value):
@@ -522,18 +537,9 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the top
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
-        
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
-            return self.y+self.height/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return self._get_aabb()[3]
     
     @top.setter
     def top(self,value):
@@ -554,17 +560,9 @@ class GLabel(GRectangle):
         Changing this value will shift the center of the object so that the bottom
         edge matches the new value.
         
-        **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
-            return self.y-self.height/2.0
-        
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return self._get_aabb()[1]
     
     
     @bottom.setter
@@ -594,14 +592,12 @@ class GLabel(GRectangle):
         self._hanchor = 'center'
         self._vanchor = 'center'
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
-        
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
+        from kivy.core.text import DEFAULT_FONT
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fname = keywords['font_name'] if 'font_name' in keywords else DEFAULT_FONT
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._bold  = keywords['bold'] if 'bold' in keywords else False
+        self._texture = None
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -612,7 +608,6 @@ class GLabel(GRectangle):
             self.linecolor = (0,0,0,1)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """
@@ -626,30 +621,73 @@ class GLabel(GRectangle):
         return '%s,text=%s,center=(%s,%s),angle=%s]' \
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
-    # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
+    # CLASS METHODS
+    @classmethod
+    def _render(cls,text,font_name,font_size,bold,color):
         """
-        A workaround to deal with parameter requirements for callbacks
+        Returns: The texture for the given text, rendering it if necessary
+        
+        Rendered text is cached by all of the arguments.  If the text is not in the
+        cache, it is rendered and added to the cache.  The cache holds at most
+        ``TEXT_CACHE_SIZE`` textures, evicting the least recently used ones.  The
+        texture may be None if the text cannot be rendered (e.g. it is empty).
+        
+        :param text: The text to render
+        :type text:  ``str``
+        
+        :param font_name: The font to render with
+        :type font_name:  ``str``
+        
+        :param font_size: The point size of the font
+        :type font_size:  ``int`` or ``float``
+        
+        :param bold: Whether to render in bold
+        :type bold:  ``bool``
+        
+        :param color: The text color
+        :type color:  4-element tuple of floats between 0 and 1
         """
-        if self._defined:
-            self._reset()
+        key = (text,font_name,font_size,bold,color)
+        if key in cls.TEXT_CACHE:
+            cls.TEXT_STATS['hits'] += 1
+            cls.TEXT_CACHE.move_to_end(key)
+            return cls.TEXT_CACHE[key]
+        
+        from kivy.core.text import Label
+        cls.TEXT_STATS['misses'] += 1
+        label = Label(text=text,font_name=font_name,font_size=font_size,bold=bold,color=color)
+        label.refresh()
+        texture = label.texture
+        
+        cls.TEXT_CACHE[key] = texture
+        while len(cls.TEXT_CACHE) > cls.TEXT_CACHE_SIZE:
+            cls.TEXT_CACHE.popitem(last=False)
+            cls.TEXT_STATS['evictions'] += 1
+        return texture
     
+    # HIDDEN METHODS
     def _reset(self):
         """
         Resets the drawing cache.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        # A new label has no earlier position to interpolate from
+        existing = self._defined
+        
+        # Get the (cached) text at the center.
+        color = (1.0,1.0,1.0,1.0) if self._linecolor is None else tuple(self.linecolor)
+        self._texture = GLabel._render(self._text,self._fname,self._fsize,self._bold,color)
+        tw, th = (0,0) if self._texture is None else self._texture.size
         
         # Resize the outside if necessary
         self._defined = False
-        self.width  = max(self.width, self._label.width)
-        self.height = max(self.height,self._label.height)
+        self.width  = max(self.width, tw)
+        self.height = max(self.height,th)
         self._defined = True
         
+        # Re-anchoring moves the label, so record where it was for interpolation
+        if existing and (self._hanchor in ('left','right') or self._vanchor in ('top','bottom')):
+            self._snapshot()
+        
         # Reset the absolute anchor
         if self._hanchor == 'left':
             self._trans.x = self._ha+self.width/2.0
@@ -661,18 +699,21 @@ class GLabel(GRectangle):
             self._trans.y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
+        self._invalidate()
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        tx = -tw/2.0
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            tx = self.width/2.0-tw
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        ty = -th/2.0
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
         
         GObject._reset(self)
         x = -self.width/2.0
@@ -683,7 +724,9 @@ class GLabel(GRectangle):
             self._cache.add(self._fillcolor)
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        if not self._texture is None:
+            self._cache.add(Color(1,1,1))
+            self._cache.add(Rectangle(pos=(int(tx),int(ty)),size=(tw,th),texture=self._texture))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
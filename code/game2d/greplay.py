@@ -0,0 +1,216 @@
+"""
+Input recording and playback for 2D games.
+
+This module reads and writes the input of a game session, one record per update.  Each
+record holds the ``dt`` given to the update and the key and touch events that update
+saw.  Together with the seed of the random number generator, this is enough to replay a
+session exactly, as fast as the game can draw.
+
+A recording is a binary file.  It starts with a header (the magic bytes ``G2DI``, a
+version and the random seed).  Each update is a double (dt) and an unsigned short (the
+number of events), followed by the events.  An event is a byte for the kind, an unsigned
+short for the key, and two doubles for the touch position.  Key names are stored once:
+the first time a key appears, it is preceded by a name record (the byte 255, a length,
+and the UTF-8 name), and is afterwards referred to by number.
+"""
+import struct
+
+# The first bytes of an input recording
+INPUT_MAGIC = b'G2DI'
+# The current recording format
+INPUT_VERSION = 1
+# The kinds of input events, in the order of their codes
+EVENT_KINDS = ('key_down','key_up','touch_down','touch_move','touch_up')
+
+# The file header (magic, version, seed)
+_HEADER = struct.Struct('<4sHQ')
+# The start of an update (dt, number of events)
+_UPDATE = struct.Struct('<dH')
+# A single event (kind, key number, x, y)
+_EVENT  = struct.Struct('<BHdd')
+# The start of a key name (marker, length)
+_NAME   = struct.Struct('<BB')
+# The kind code that marks a key name
+_NAME_MARKER = 255
+
+
+class InputWriter(object):
+    """
+    A class that writes the input of a game session to a file.
+    
+    **You should never construct an object of this class yourself**.  Use the keyword
+    ``record`` when making a :class:`GameApp` instead.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def path(self):
+        """
+        The file written to.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a string.
+        """
+        return self._path
+    
+    @property
+    def seed(self):
+        """
+        The random seed of the session.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._seed
+    
+    @property
+    def updates(self):
+        """
+        The number of updates written.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._updates
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,path,seed):
+        """
+        Creates a new recording, writing its header.
+        
+        :param path: The file to write
+        :type path:  ``str``
+        
+        :param seed: The random seed of the session
+        :type seed:  ``int`` >= 0
+        """
+        assert type(path) == str, '%s is not a path' % repr(path)
+        assert type(seed) == int and seed >= 0, '%s is not a valid seed' % repr(seed)
+        self._path  = path
+        self._seed  = seed
+        self._names = {}
+        self._updates = 0
+        self._file = open(path,'wb')
+        self._file.write(_HEADER.pack(INPUT_MAGIC,INPUT_VERSION,seed))
+    
+    
+    # PUBLIC METHODS
+    def write(self,dt,events):
+        """
+        Writes the record for one update.
+        
+        :param dt: The time given to the update
+        :type dt:  ``float``
+        
+        :param events: The events seen by the update
+        :type events:  sequence of (kind, key, x, y) tuples
+        """
+        data = [_UPDATE.pack(dt,len(events))]
+        for kind, key, x, y in events:
+            number = 0
+            if not key is None:
+                if not key in self._names:
+                    name = key.encode('utf-8')
+                    self._names[key] = len(self._names)+1
+                    data.append(_NAME.pack(_NAME_MARKER,len(name)))
+                    data.append(name)
+                number = self._names[key]
+            data.append(_EVENT.pack(EVENT_KINDS.index(kind),number,
+                                    0.0 if x is None else x,0.0 if y is None else y))
+        self._file.write(b''.join(data))
+        self._updates += 1
+    
+    def close(self):
+        """
+        Closes the recording.
+        
+        Calling this method more than once has no effect.
+        """
+        if not self._file.closed:
+            self._file.close()
+
+
+# #mark -
+class InputReader(object):
+    """
+    A class that reads the input of a game session from a file.
+    
+    Iterating over a reader gives a (dt, events) pair for every update, where events is
+    a tuple of (kind, key, x, y) tuples.  This is the same format as a scripted input
+    stream, so either may be given to the keyword ``playback`` of :class:`GameApp`.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def path(self):
+        """
+        The file read from.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a string.
+        """
+        return self._path
+    
+    @property
+    def seed(self):
+        """
+        The random seed of the recorded session.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._seed
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,path):
+        """
+        Opens a recording, reading its header.
+        
+        :param path: The file to read
+        :type path:  ``str``
+        """
+        assert type(path) == str, '%s is not a path' % repr(path)
+        self._path = path
+        with open(path,'rb') as file:
+            self._data = file.read()
+        if len(self._data) < _HEADER.size:
+            raise IOError('%s is not an input recording' % repr(path))
+        
+        magic, version, seed = _HEADER.unpack_from(self._data,0)
+        if magic != INPUT_MAGIC or version != INPUT_VERSION:
+            raise IOError('%s is not an input recording' % repr(path))
+        self._seed = seed
+    
+    def __iter__(self):
+        """
+        Yields the (dt, events) pair for each update in the recording.
+        """
+        data = self._data
+        names = [None]
+        offset = _HEADER.size
+        while offset < len(data):
+            dt, count = _UPDATE.unpack_from(data,offset)
+            offset += _UPDATE.size
+            events = []
+            while len(events) < count:
+                if data[offset] == _NAME_MARKER:
+                    size = _NAME.unpack_from(data,offset)[1]
+                    offset += _NAME.size
+                    names.append(data[offset:offset+size].decode('utf-8'))
+                    offset += size
+                    continue
+                kind, number, x, y = _EVENT.unpack_from(data,offset)
+                offset += _EVENT.size
+                kind = EVENT_KINDS[kind]
+                if kind.startswith('key'):
+                    events.append((kind,names[number],None,None))
+                else:
+                    events.append((kind,None,x,y))
+            yield (dt,tuple(events))
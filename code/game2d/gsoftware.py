@@ -0,0 +1,678 @@
+"""
+Software rendering for 2D games.
+
+This module provides a view that draws game objects into a NumPy array instead of a
+window.  It needs no window and no OpenGL context, so it can run on a headless server
+to produce pixel observations for bots, or thumbnails of a game in progress.  At a
+reduced resolution it can draw thousands of frames per second.
+
+The game objects themselves still create Kivy graphics instructions.  To use them
+without a GPU, set the environment variable ``KIVY_GL_BACKEND`` to 'mock' before
+importing ``game2d``.  Without a game, the asset folders must also be given to
+:meth:`GameApp.set_folder`, or the objects cannot find their images.  The view is then
+used like any other view::
+    
+    GameApp.set_folder(folder)      # The folder containing Images, Fonts and Sounds
+    wave = Wave()
+    view = GSoftView(GAME_WIDTH,GAME_HEIGHT,downscale=4)
+    view.clear()
+    wave.draw(view)
+    pixels = view.frame
+
+The script :mod:`game2d.softcheck` does exactly this, and checks the result.
+
+Images are read from the **Images** folder with their pixel data kept in memory.  Text
+is rasterized with PIL (the Python Imaging Library) if it is installed; otherwise only
+the background of a label is drawn.
+"""
+import os
+import math
+import numpy as np
+
+
+class GSoftView(object):
+    """
+    A class representing a view that draws into a NumPy array.
+    
+    Pass this view to the method ``draw`` of any :class:`GObject`, exactly as you would
+    the view of :class:`GameApp`.  The result is in the attribute :attr:`frame`, an
+    array of shape (height,width,3) (or 4 with alpha) of 8-bit pixels.  The first row is
+    the top of the game window.
+    
+    The frame is reused between calls to :meth:`clear`, so it should be copied if it
+    needs to be kept.  The view draws the same shapes as the window, with one
+    simplification: textures are sampled with nearest neighbor filtering.  When a
+    texture is drawn at an integer fraction of its size (such as every image in a view
+    with ``downscale`` 2), the texture is sliced instead of sampled.
+    """
+    # Class attribute for sharing decoded image pixels (keyed by file name)
+    PIXEL_CACHE = {}
+    # Class attribute for sharing rendered text (keyed by text, font name and size)
+    TEXT_CACHE = {}
+    # The maximum number of text renderings to keep
+    TEXT_CACHE_SIZE = 256
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def frame(self):
+        """
+        The pixels drawn since the last call to :meth:`clear`.
+        
+        **Immutable**: This value cannot be altered (though its contents can).
+        
+        **Invariant**: Must be a NumPy array of ``uint8`` of shape (height,width,channels).
+        """
+        return self._buffer
+    
+    @property
+    def width(self):
+        """
+        The width of the frame in pixels.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._buffer.shape[1]
+    
+    @property
+    def height(self):
+        """
+        The height of the frame in pixels.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._buffer.shape[0]
+    
+    @property
+    def downscale(self):
+        """
+        The number of game units per pixel.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._downscale
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,width,height,downscale=1,alpha=False):
+        """
+        Creates a new software view.
+        
+        The frame is ``width//downscale`` pixels wide and ``height//downscale`` pixels
+        high.  It starts out white, like the view of a game window.
+        
+        :param width: The width of the game window
+        :type width:  ``int`` > 0
+        
+        :param height: The height of the game window
+        :type height:  ``int`` > 0
+        
+        :param downscale: The number of game units per pixel
+        :type downscale:  ``int`` > 0
+        
+        :param alpha: Whether the frame has an alpha channel
+        :type alpha:  ``bool``
+        """
+        assert type(width) == int and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) == int and height > 0, '%s is not a valid height' % repr(height)
+        assert type(downscale) == int and downscale > 0, '%s is not a valid scale' % repr(downscale)
+        assert width >= downscale and height >= downscale, 'scale %d is too large' % downscale
+        self._downscale = downscale
+        self._buffer = np.empty((height//downscale,width//downscale,4 if alpha else 3),dtype=np.uint8)
+        
+        # The map from game coordinates to pixels (flipping y)
+        self._screen = np.array([[1.0/downscale,0.0,0.0],
+                                 [0.0,-1.0/downscale,float(self._buffer.shape[0])]])
+        self.clear()
+    
+    
+    # PUBLIC METHODS
+    def draw(self,cmd):
+        """
+        Draws the given Kivy graphics command to this view.
+        
+        Raw Kivy commands cannot be rasterized, so they are ignored.  Game objects are
+        drawn with :meth:`draw_object`, which :class:`GObject` calls for you.
+        
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        pass
+    
+    def draw_object(self,obj,parent=None):
+        """
+        Rasterizes the given game object into the frame.
+        
+        You should not need to call this method.  The method ``draw`` of
+        :class:`GObject` calls it for you when given a software view.
+        
+        :param obj: the object to draw
+        :type obj:  :class:`GObject`
+        
+        :param parent: the transform of the enclosing scene (None for the window)
+        :type parent:  2x3 NumPy array or ``None``
+        """
+        from .gobject import GScene
+        from .grectangle import GRectangle, GEllipse, GImage, GLabel
+        from .gsprite import GSprite
+        from .gtext import GGlyphLabel
+        from .gpath import GPath, GTriangle, GPolygon
+        from .gparticle import GParticles
+        
+        matrix = _compose(self._screen if parent is None else parent,_local_affine(obj))
+        w = obj.width/2.0
+        h = obj.height/2.0
+        box = (-w,-h,w,h)
+        
+        if isinstance(obj,GScene):
+            for child in obj.children:
+                self.draw_object(child,matrix)
+            return
+        elif isinstance(obj,GParticles):
+            for (px, py), frame in zip(obj.positions(),obj.current_frames()):
+                pixels = self._frame_pixels(obj.source,obj._format,frame)
+                self._blit(matrix,(px-w,py-h,px+w,py+h),obj.fillcolor,pixels)
+            return
+        elif isinstance(obj,GSprite):
+            self._blit(matrix,box,obj.fillcolor,self._frame_pixels(obj.source,obj._format,obj.frame))
+        elif isinstance(obj,GImage):
+            self._blit(matrix,box,obj.fillcolor,self._image_pixels(obj.source))
+        elif isinstance(obj,GLabel):
+            self._blit(matrix,box,obj.fillcolor)
+            self._draw_label(matrix,obj)
+        elif isinstance(obj,GEllipse):
+            rx = w*w
+            ry = h*h
+            self._blit(matrix,box,obj.fillcolor,test=lambda u, v: u*u/rx+v*v/ry <= 1.0)
+        elif isinstance(obj,GRectangle):
+            self._blit(matrix,box,obj.fillcolor)
+        elif isinstance(obj,GGlyphLabel):
+            self._draw_glyphs(matrix,obj)
+            return
+        elif isinstance(obj,(GTriangle,GPolygon)):
+            self._draw_polygon(matrix,obj)
+            return
+        elif isinstance(obj,GPath):
+            self._draw_path(matrix,obj.points,obj.linewidth,obj.linecolor,False)
+            return
+        
+        if obj.linecolor and obj.linewidth > 0:
+            self._draw_path(matrix,(-w,-h,w,-h,w,h,-w,h),obj.linewidth,obj.linecolor,True)
+    
+    def clear(self):
+        """
+        Clears the frame to white (and opaque, if there is an alpha channel).
+        """
+        self._buffer.fill(255)
+    
+    
+    # HIDDEN METHODS
+    def _blit(self,matrix,box,color,pixels=None,test=None):
+        """
+        Draws a (transformed) rectangle, either solid or textured.
+        
+        If ``pixels`` is None, the rectangle is filled with ``color``.  Otherwise the
+        pixels are stretched to fit the rectangle, and tinted by ``color`` (if any).  The
+        optional ``test`` further restricts the shape; it takes arrays of local
+        coordinates and returns a boolean array.
+        
+        :param matrix: The map from local coordinates to pixels
+        :type matrix:  2x3 NumPy array
+        
+        :param box: The rectangle (left,bottom,right,top) in local coordinates
+        :type box:  4-element tuple of ``float``
+        
+        :param color: The fill color or tint
+        :type color:  4-element list of ``float``, or ``None``
+        
+        :param pixels: The texture pixels (top row first)
+        :type pixels:  NumPy array of ``uint8`` with shape (h,w,4), or ``None``
+        
+        :param test: The shape test
+        :type test:  function or ``None``
+        """
+        if pixels is None and not color:
+            return
+        
+        l, b, r, t = box
+        if r <= l or t <= b:
+            return
+        
+        corners = np.dot(((l,b),(r,b),(r,t),(l,t)),matrix[:,:2].T)+matrix[:,2]
+        rows, cols = self._buffer.shape[:2]
+        c0 = max(int(math.floor(corners[:,0].min())),0)
+        c1 = min(int(math.ceil(corners[:,0].max())),cols)
+        r0 = max(int(math.floor(corners[:,1].min())),0)
+        r1 = min(int(math.ceil(corners[:,1].max())),rows)
+        if c0 >= c1 or r0 >= r1:
+            return
+        
+        xs = np.arange(c0,c1)+0.5
+        ys = np.arange(r0,r1)+0.5
+        if matrix[0,1] == 0 and matrix[1,0] == 0 and test is None:
+            # Axis-aligned, so the samples are separable
+            u = (xs-matrix[0,2])/matrix[0,0]
+            v = (ys-matrix[1,2])/matrix[1,1]
+            cs = np.nonzero((u >= l) & (u < r))[0]
+            rs = np.nonzero((v >= b) & (v < t))[0]
+            if len(cs) == 0 or len(rs) == 0:
+                return
+            
+            target = self._buffer[r0+rs[0]:r0+rs[-1]+1,c0+cs[0]:c0+cs[-1]+1]
+            source = None
+            if not pixels is None:
+                th, tw = pixels.shape[:2]
+                tx = np.clip(((u[cs]-l)*tw/(r-l)).astype(int),0,tw-1)
+                ty = np.clip(((t-v[rs])*th/(t-b)).astype(int),0,th-1)
+                source = pixels[_as_slice(ty)][:,_as_slice(tx)]
+            target[...] = _composite(target,source,color)
+            return
+        
+        # The general case: map each pixel back to the rectangle
+        inverse = _invert(matrix)
+        gx, gy = np.meshgrid(xs,ys)
+        u = inverse[0,0]*gx+inverse[0,1]*gy+inverse[0,2]
+        v = inverse[1,0]*gx+inverse[1,1]*gy+inverse[1,2]
+        mask = (u >= l) & (u < r) & (v >= b) & (v < t)
+        if not test is None:
+            mask &= test(u,v)
+        if not mask.any():
+            return
+        
+        target = self._buffer[r0:r1,c0:c1]
+        source = None
+        if not pixels is None:
+            th, tw = pixels.shape[:2]
+            tx = np.clip(((u[mask]-l)*tw/(r-l)).astype(int),0,tw-1)
+            ty = np.clip(((t-v[mask])*th/(t-b)).astype(int),0,th-1)
+            source = pixels[ty,tx]
+        target[mask] = _composite(target[mask],source,color)
+    
+    def _draw_path(self,matrix,points,width,color,closed):
+        """
+        Draws a sequence of line segments.
+        
+        Each segment is drawn as a rectangle of the given width.  The width is at
+        least one pixel, so that thin lines do not vanish in a downscaled view.
+        
+        :param matrix: The map from local coordinates to pixels
+        :type matrix:  2x3 NumPy array
+        
+        :param points: The vertices of the path
+        :type points:  even sequence of numbers
+        
+        :param width: The line width in local coordinates
+        :type width:  ``int`` or ``float``
+        
+        :param color: The line color
+        :type color:  4-element list of ``float``, or ``None``
+        
+        :param closed: Whether to connect the last point to the first
+        :type closed:  ``bool``
+        """
+        if not color:
+            return
+        
+        width = max(width,self._downscale)/2.0
+        points = list(points)
+        if closed:
+            points += points[:2]
+        for i in range(0,len(points)-2,2):
+            x0, y0, x1, y1 = points[i:i+4]
+            length = math.hypot(x1-x0,y1-y0)/2.0
+            angle = math.atan2(y1-y0,x1-x0)
+            segment = np.array([[math.cos(angle),-math.sin(angle),(x0+x1)/2.0],
+                                [math.sin(angle), math.cos(angle),(y0+y1)/2.0]])
+            box = (-length-width,-width,length+width,width)
+            self._blit(_compose(matrix,segment),box,color)
+    
+    def _draw_polygon(self,matrix,obj):
+        """
+        Draws a triangle or polygon using its precomputed triangles.
+        
+        :param matrix: The map from local coordinates to pixels
+        :type matrix:  2x3 NumPy array
+        
+        :param obj: The polygon to draw
+        :type obj:  :class:`GTriangle` or :class:`GPolygon`
+        """
+        from .gpath import _in_half_planes
+        verts = np.asarray(obj.points,dtype=float).reshape(-1,2)
+        box = tuple(verts.min(axis=0))+tuple(verts.max(axis=0))
+        normals = obj._normals
+        offsets = obj._offsets
+        
+        def test(u,v):
+            points = np.column_stack((u.ravel(),v.ravel()))
+            return _in_half_planes(points,normals,offsets).reshape(u.shape)
+        
+        # Extend the box slightly, as the right and top edges are exclusive
+        box = (box[0],box[1],box[2]+1e-6,box[3]+1e-6)
+        self._blit(matrix,box,obj.fillcolor,test=test)
+        if obj.linewidth > 0:
+            self._draw_path(matrix,obj.points,obj.linewidth,obj.linecolor,True)
+    
+    def _draw_label(self,matrix,obj):
+        """
+        Draws the text of a label, positioned as in the window.
+        
+        :param matrix: The map from local coordinates to pixels
+        :type matrix:  2x3 NumPy array
+        
+        :param obj: The label to draw
+        :type obj:  :class:`GLabel`
+        """
+        pixels = self._text_pixels(obj.text,obj.font_name,obj.font_size)
+        if pixels is None:
+            return
+        
+        th, tw = pixels.shape[:2]
+        tx = -tw/2.0
+        if obj.halign == 'left':
+            tx = -obj.width/2.0
+        elif obj.halign == 'right':
+            tx = obj.width/2.0-tw
+        
+        ty = -th/2.0
+        if obj.valign == 'top':
+            ty = obj.height/2.0-th
+        elif obj.valign == 'bottom':
+            ty = -obj.height/2.0
+        
+        color = obj.linecolor if obj.linecolor else (1.0,1.0,1.0,1.0)
+        self._blit(matrix,(tx,ty,tx+tw,ty+th),color,pixels)
+    
+    def _draw_glyphs(self,matrix,obj):
+        """
+        Draws the text of a glyph label, anchored as in the window.
+        
+        :param matrix: The map from local coordinates to pixels
+        :type matrix:  2x3 NumPy array
+        
+        :param obj: The label to draw
+        :type obj:  :class:`GGlyphLabel`
+        """
+        pixels = self._text_pixels(obj.text,obj.font_name,obj.font_size)
+        if pixels is None:
+            return
+        
+        th, tw = pixels.shape[:2]
+        if obj.halign == 'left':
+            tx = 0
+        elif obj.halign == 'right':
+            tx = -tw
+        else:
+            tx = -tw/2.0
+        self._blit(matrix,(tx,-th/2.0,tx+tw,th/2.0),obj.linecolor,pixels)
+    
+    def _frame_pixels(self,source,format,frame):
+        """
+        Returns: The pixels of a single frame of a filmstrip (or None)
+        
+        :param source: The file name of the filmstrip
+        :type source:  ``str``
+        
+        :param format: The filmstrip grid size (rows, columns)
+        :type format:  2-element tuple of ``int`` > 0
+        
+        :param frame: The frame index
+        :type frame:  ``int`` in 0..rows*columns-1
+        """
+        pixels = self._image_pixels(source)
+        if pixels is None:
+            return None
+        
+        rows, cols = format
+        fh = pixels.shape[0]//rows
+        fw = pixels.shape[1]//cols
+        r = frame//cols
+        c = frame % cols
+        return pixels[r*fh:(r+1)*fh,c*fw:(c+1)*fw]
+    
+    @classmethod
+    def _image_pixels(cls,name):
+        """
+        Returns: The pixels of the given image file (or None if it cannot be loaded)
+        
+        The pixels are an RGBA array with the top row first.  They are decoded only once
+        per file.
+        
+        :param name: The file name in the **Images** folder
+        :type name:  ``str`` or ``None``
+        """
+        if name is None:
+            return None
+        if name in cls.PIXEL_CACHE:
+            return cls.PIXEL_CACHE[name]
+        
+        pixels = None
+        try:
+            from kivy.core.image import ImageLoader
+            image = ImageLoader.load(_find_file('images',name),keep_data=True)
+            data  = image._data[0]
+            pixels = _to_rgba(data.data,data.width,data.height,data.fmt,
+                              getattr(data,'rowlength',0))
+            if not getattr(data,'flip_vertical',True):
+                pixels = pixels[::-1]
+        except:
+            print('Failed to load',repr(name))
+        
+        cls.PIXEL_CACHE[name] = pixels
+        return pixels
+    
+    @classmethod
+    def _text_pixels(cls,text,font_name,font_size):
+        """
+        Returns: The pixels of the given text rendered in white (or None)
+        
+        The result is None if the text is empty, or if PIL is not installed.
+        
+        :param text: The text to render
+        :type text:  ``str``
+        
+        :param font_name: The font file (or registered Kivy font name)
+        :type font_name:  ``str``
+        
+        :param font_size: The point size of the font
+        :type font_size:  ``int`` or ``float``
+        """
+        key = (text,font_name,font_size)
+        if key in cls.TEXT_CACHE:
+            return cls.TEXT_CACHE[key]
+        
+        pixels = None
+        try:
+            from PIL import Image, ImageDraw, ImageFont
+            path = _find_file('fonts',font_name)
+            try:
+                font = ImageFont.truetype(path,int(font_size))
+            except:
+                font = ImageFont.load_default()
+            
+            lines = text.split('\n')
+            ascent, descent = font.getmetrics()
+            width = max(int(math.ceil(font.getlength(line))) for line in lines)
+            height = (ascent+descent)*len(lines)
+            if width > 0:
+                image = Image.new('L',(width,height),0)
+                ImageDraw.Draw(image).multiline_text((0,0),text,fill=255,font=font,spacing=0)
+                pixels = np.empty((height,width,4),dtype=np.uint8)
+                pixels[:,:,:3] = 255
+                pixels[:,:,3] = np.asarray(image)
+        except ImportError:
+            pass
+        
+        if len(cls.TEXT_CACHE) >= cls.TEXT_CACHE_SIZE:
+            cls.TEXT_CACHE.clear()
+        cls.TEXT_CACHE[key] = pixels
+        return pixels
+
+
+# #mark -
+def _local_affine(obj):
+    """
+    Returns: The 2x3 affine map from the local coordinates of obj to its parent
+    
+    :param obj: The game object
+    :type obj:  :class:`GObject`
+    """
+    radians = math.radians(obj._rotate.angle)
+    cos = math.cos(radians)
+    sin = math.sin(radians)
+    sx = obj._scale.x
+    sy = obj._scale.y
+    return np.array([[cos*sx,-sin*sy,obj._trans.x],
+                     [sin*sx, cos*sy,obj._trans.y]])
+
+
+def _compose(a,b):
+    """
+    Returns: The 2x3 affine map that applies b and then a
+    
+    :param a: The second map
+    :type a:  2x3 NumPy array
+    
+    :param b: The first map
+    :type b:  2x3 NumPy array
+    """
+    result = np.dot(a[:,:2],b)
+    result[:,2] += a[:,2]
+    return result
+
+
+def _invert(a):
+    """
+    Returns: The inverse of the 2x3 affine map a
+    
+    :param a: The map to invert
+    :type a:  2x3 NumPy array
+    """
+    linear = np.linalg.inv(a[:,:2])
+    return np.column_stack((linear,-np.dot(linear,a[:,2])))
+
+
+def _as_slice(indices):
+    """
+    Returns: A slice equivalent to the given indices, or the indices themselves
+    
+    Indexing with a slice makes a view instead of a copy.  Texture samples are evenly
+    spaced whenever a texture is drawn at an integer fraction of its size.
+    
+    :param indices: The (increasing) indices to take
+    :type indices:  NumPy array of ``int``
+    """
+    if len(indices) == 1:
+        return slice(indices[0],indices[0]+1)
+    step = indices[1]-indices[0]
+    if step > 0 and indices[-1]-indices[0] == step*(len(indices)-1) and (np.diff(indices) == step).all():
+        return slice(indices[0],indices[-1]+1,step)
+    return indices
+
+
+def _composite(target,source,color):
+    """
+    Returns: The pixels of target with source (or color) drawn over them
+    
+    :param target: The destination pixels
+    :type target:  NumPy array of ``uint8`` with shape (...,3) or (...,4)
+    
+    :param source: The source pixels, or None to fill with color
+    :type source:  NumPy array of ``uint8`` with shape (...,4), or ``None``
+    
+    :param color: The fill color, or the tint of source
+    :type color:  4-element list of ``float``, or ``None``
+    """
+    channels = target.shape[-1]
+    if source is None:
+        alpha = color[3]
+        rgb = np.multiply(color[:3],255.0)
+        if alpha >= 1:
+            result = np.empty_like(target)
+            result[...,:3] = rgb
+            if channels == 4:
+                result[...,3] = 255
+            return result
+        result = target.astype(np.float32)
+        result[...,:3] = result[...,:3]*(1-alpha)+rgb*alpha
+        if channels == 4:
+            result[...,3] = np.maximum(result[...,3],alpha*255)
+        return result.astype(np.uint8)
+    
+    if (color is None or min(color) >= 1) and (source[...,3] == 255).all():
+        return source[...,:channels]
+    
+    alpha = source[...,3:4]/255.0
+    rgb = source[...,:3].astype(np.float32)
+    if not color is None:
+        alpha = alpha*color[3]
+        rgb = rgb*np.asarray(color[:3],dtype=np.float32)
+    result = target.astype(np.float32)
+    result[...,:3] = result[...,:3]*(1-alpha)+rgb*alpha
+    if channels == 4:
+        result[...,3:4] = np.maximum(result[...,3:4],alpha*255)
+    return result.astype(np.uint8)
+
+
+def _to_rgba(data,width,height,fmt,rowlength=0):
+    """
+    Returns: Decoded image data as an RGBA array of shape (height,width,4)
+    
+    :param data: The raw pixel data
+    :type data:  ``bytes``
+    
+    :param width: The image width
+    :type width:  ``int``
+    
+    :param height: The image height
+    :type height:  ``int``
+    
+    :param fmt: The pixel format ('rgba', 'bgra', 'rgb' or 'bgr')
+    :type fmt:  ``str``
+    
+    :param rowlength: The number of pixels per row in data (0 if the same as width)
+    :type rowlength:  ``int``
+    """
+    channels = len(fmt)
+    pixels = np.frombuffer(data,dtype=np.uint8)
+    stride = (rowlength if rowlength else width)*channels
+    stride = max(stride,len(pixels)//height)
+    pixels = pixels[:stride*height].reshape(height,stride)[:,:width*channels]
+    pixels = pixels.reshape(height,width,channels)
+    
+    result = np.empty((height,width,4),dtype=np.uint8)
+    order = [fmt.index(c) for c in 'rgb']
+    result[:,:,:3] = pixels[:,:,order]
+    result[:,:,3] = pixels[:,:,fmt.index('a')] if 'a' in fmt else 255
+    return result
+
+
+def _find_file(kind,name):
+    """
+    Returns: The path to the given asset
+    
+    The file is looked for in the asset folder of :class:`GameApp` (if the application
+    has set it), and then in the Kivy resource paths.  If it cannot be found, the name
+    is returned unchanged.
+    
+    :param kind: The asset folder ('images' or 'fonts')
+    :type kind:  ``str``
+    
+    :param name: The file name
+    :type name:  ``str``
+    """
+    from .app import GameApp
+    folder = getattr(GameApp,kind,None)
+    if folder and os.path.isfile(os.path.join(folder,name)):
+        return os.path.join(folder,name)
+    
+    from kivy.resources import resource_find
+    for candidate in (name,name+'.ttf',name+'-Regular.ttf'):
+        path = resource_find(candidate)
+        if path:
+            return path
+    return name
@@ -34,6 +34,8 @@ class GSprite(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    # Class attribute for sharing filmstrip frames (keyed by source and format)
+    FRAME_CACHE = {}
     
     # MUTABLE PROPERTIES
     @property
@@ -75,6 +77,7 @@ class GSprite(GRectangle):
         assert type(value) == int, '%s is not an int' % repr(value)
         assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
+        GObject.EPOCH += 1
         if self._bounds:
             self._texture = self._images[self._frame]
             self._bounds.texture = self._texture
@@ -109,6 +112,47 @@ class GSprite(GRectangle):
         GRectangle.__init__(self,**keywords)
         self._defined = True
     
+    
+    # CLASS METHODS
+    @classmethod
+    def _load_frames(cls,source,format):
+        """
+        Returns: The list of frame regions for the given filmstrip, or None on failure
+        
+        The frames are sliced from the texture for ``source`` only once per pair of
+        ``source`` and ``format``.  Every sprite using that filmstrip shares the same
+        list, so the list should never be modified.  If the texture was unloaded and
+        reloaded in the meantime, the frames are sliced again from the new texture.
+        
+        :param source: The file name of the filmstrip
+        :type source:  ``str``
+        
+        :param format: The filmstrip grid size (rows, columns)
+        :type format:  2-element tuple of ``int`` > 0
+        """
+        texture = GameApp.load_texture(source)
+        if not texture:
+            return None
+        
+        key = (source,format)
+        if key in cls.FRAME_CACHE and cls.FRAME_CACHE[key][0] is texture:
+            return cls.FRAME_CACHE[key][1]
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        
+        frames = [None]*(format[0]*format[1])
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                frames[row*format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
+                tx += width
+            ty += height
+        
+        cls.FRAME_CACHE[key] = (texture,frames)
+        return frames
+    
     # HIDDEN METHODS
     def _setFormat(self,value):
         """
@@ -130,18 +174,9 @@ class GSprite(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+        frames = GSprite._load_frames(self.source,self._format)
+        if frames:
+            self._images = frames
         else:
             print('Failed to load',repr(self.source))
         
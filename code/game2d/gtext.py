@@ -0,0 +1,376 @@
+"""
+Bitmap text support for 2D games.
+
+This module provides text that is cheap to change every animation frame, such as a
+score, a life counter or a frame rate.  The glyphs of a font are rendered once into a
+texture atlas, and a string is drawn as a single mesh of textured quads.  Changing the
+text only rewrites the vertices of that mesh.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+
+# The fonts to build atlases for in GlyphAtlas.seed
+HUD_FONTS = ('RetroGame.ttf','Arcade.ttf')
+# The characters in an atlas, unless another set is specified
+HUD_CHARS = ''.join(chr(x) for x in range(32,127))
+
+
+class GlyphAtlas(object):
+    """
+    A class representing the pre-rendered glyphs of a font at a given point size.
+    
+    The glyphs are rendered in white, one at a time, and then packed into a single
+    texture.  Text drawn with the atlas may be tinted any color.  Each glyph is drawn
+    with its own advance width, so kerning is ignored.  Characters that are not in the
+    atlas are drawn as spaces.
+    
+    Atlases are expensive to make but free to share.  You should get them with the
+    class method :meth:`get` rather than the constructor.
+    """
+    # Class attribute for sharing atlases (keyed by font name, point size and characters)
+    ATLASES = {}
+    # The maximum width of an atlas texture in pixels
+    MAX_WIDTH = 512
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture containing all of the glyphs.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a ``kivy.graphics.texture.Texture``.
+        """
+        return self._fbo.texture
+    
+    @property
+    def line_height(self):
+        """
+        The height of a line of text in pixels.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._height
+    
+    
+    # CLASS METHODS
+    @classmethod
+    def get(cls,font_name,font_size,chars=HUD_CHARS):
+        """
+        Returns: The atlas for the given font and point size, building it if necessary
+        
+        :param font_name: The font file in the **Fonts** folder
+        :type font_name:  ``str``
+        
+        :param font_size: The point size of the font
+        :type font_size:  ``int`` or ``float`` > 0
+        
+        :param chars: The characters to include in the atlas
+        :type chars:  ``str``
+        """
+        key = (font_name,font_size,chars)
+        if not key in cls.ATLASES:
+            cls.ATLASES[key] = GlyphAtlas(font_name,font_size,chars)
+        return cls.ATLASES[key]
+    
+    @classmethod
+    def seed(cls,sizes):
+        """
+        Builds the atlases for the fonts in ``HUD_FONTS`` at the given point sizes.
+        
+        This method should be called in the ``start`` method of a game, so that the HUD
+        text never has to wait for an atlas.
+        
+        :param sizes: The point sizes to build
+        :type sizes:  iterable of ``int`` or ``float`` > 0
+        """
+        for name in HUD_FONTS:
+            for size in sizes:
+                cls.get(name,size)
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,font_name,font_size,chars=HUD_CHARS):
+        """
+        Creates a new glyph atlas by rendering every character.
+        
+        :param font_name: The font file in the **Fonts** folder
+        :type font_name:  ``str``
+        
+        :param font_size: The point size of the font
+        :type font_size:  ``int`` or ``float`` > 0
+        
+        :param chars: The characters to include in the atlas
+        :type chars:  ``str``
+        """
+        from .app import GameApp
+        from kivy.core.text import Label
+        assert GameApp.is_font(font_name), '%s is not a font file' % repr(font_name)
+        assert type(font_size) in [int,float] and font_size > 0, '%s is not a valid size' % repr(font_size)
+        assert type(chars) == str and len(chars) > 0, '%s is not a valid character set' % repr(chars)
+        
+        textures = {}
+        for c in chars:
+            label = Label(text=c,font_name=font_name,font_size=font_size,color=(1,1,1,1))
+            label.refresh()
+            textures[c] = label.texture
+        self._height = max(int(t.height) for t in textures.values())
+        
+        # Pack the glyphs in rows, with a pixel of padding to prevent bleeding
+        places = {}
+        x = 1
+        y = 1
+        for c in chars:
+            w = int(textures[c].width)
+            if x+w+1 > GlyphAtlas.MAX_WIDTH:
+                x  = 1
+                y += self._height+1
+            places[c] = (x,y,w)
+            x += w+1
+        width  = GlyphAtlas.MAX_WIDTH
+        height = y+self._height+1
+        
+        self._fbo = Fbo(size=(width,height))
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(Color(1,1,1,1))
+        self._glyphs = {}
+        for c in chars:
+            gx, gy, gw = places[c]
+            self._fbo.add(Rectangle(pos=(gx,gy),size=(gw,self._height),texture=textures[c]))
+            self._glyphs[c] = (gw,float(gx)/width,float(gy)/height,
+                               float(gx+gw)/width,float(gy+self._height)/height)
+        self._fbo.draw()
+        self._space = self._glyphs[' '] if ' ' in self._glyphs else (self._height//2,0,0,0,0)
+    
+    
+    # PUBLIC METHODS
+    def measure(self,text):
+        """
+        Returns: The width of the given text in pixels
+        
+        :param text: The text to measure
+        :type text:  ``str``
+        """
+        width = 0
+        for c in text:
+            width += self._glyphs.get(c,self._space)[0]
+        return width
+    
+    def layout(self,text,x,y,vertices,indices):
+        """
+        Writes the quads for the given text into the vertex and index lists.
+        
+        The text starts with its bottom left corner at (x,y).  Each character adds four
+        vertices (in the format x, y, u, v) and six indices (two triangles).  The lists
+        are extended, not replaced.
+        
+        :param text: The text to lay out
+        :type text:  ``str``
+        
+        :param x: The left edge of the text
+        :type x:  ``int`` or ``float``
+        
+        :param y: The bottom edge of the text
+        :type y:  ``int`` or ``float``
+        
+        :param vertices: The list to add the vertices to
+        :type vertices:  ``list``
+        
+        :param indices: The list to add the indices to
+        :type indices:  ``list``
+        """
+        h = self._height
+        for c in text:
+            w, u0, v0, u1, v1 = self._glyphs.get(c,self._space)
+            if c != ' ' and c in self._glyphs:
+                n = len(vertices)//4
+                vertices.extend((x,y,u0,v0, x+w,y,u1,v0, x+w,y+h,u1,v1, x,y+h,u0,v1))
+                indices.extend((n,n+1,n+2, n+2,n+3,n))
+            x += w
+
+
+# #mark -
+class GGlyphLabel(GObject):
+    """
+    A class representing text drawn from a glyph atlas.
+    
+    This class is an alternative to :class:`GLabel` for text that changes often.  A
+    ``GLabel`` renders its text with the font every time the text changes.  A
+    ``GGlyphLabel`` renders each character of the font only once (see
+    :class:`GlyphAtlas`), so changing the text only rewrites a few vertices.  On the
+    other hand, it only supports a single line and ignores kerning.
+    
+    The attribute ``linecolor`` is the color of the text, and changing it is cheap.  The
+    attributes ``width`` and ``height`` are immutable, as they are computed from the
+    text.  The text is anchored at (x,y) according to the attribute ``halign``.
+    """
+    
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text for this label.
+        
+        **Invariant**: Must be a string without newlines.
+        """
+        return self._text
+    
+    @text.setter
+    def text(self,value):
+        assert type(value) == str and not '\n' in value, 'value %s is not a single line' % repr(value)
+        if value != self._text:
+            self._text = value
+            if self._defined:
+                self._layout()
+    
+    @property
+    def halign(self):
+        """
+        The horizontal anchor of the text.
+        
+        If this value is 'left', the text starts at x.  If it is 'right', the text ends
+        at x.  Otherwise the text is centered on x.
+        
+        **Invariant**: Must be one of 'left', 'right', or 'center'
+        """
+        return self._halign
+    
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+        if self._defined:
+            self._layout()
+    
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The font file for this label.
+        
+        **Immutable**: This value cannot be changed after the label is created.
+        
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts
+        """
+        return self._fname
+    
+    @property
+    def font_size(self):
+        """
+        The point size of the font for this label.
+        
+        **Immutable**: This value cannot be changed after the label is created.
+        
+        **Invariant**: Must be a positive number (int or float)
+        """
+        return self._fsize
+    
+    @property
+    def width(self):
+        """
+        The horizontal width of the text.
+        
+        **Immutable**: This value is computed from the text.
+        
+        **Invariant**: Must be an int or float >= 0.
+        """
+        return self._atlas.measure(self._text)
+    
+    @property
+    def height(self):
+        """
+        The vertical height of the text.
+        
+        **Immutable**: This value is computed from the font.
+        
+        **Invariant**: Must be an int or float >= 0.
+        """
+        return self._atlas.line_height
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new glyph label.
+        
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to create a
+        counter in the top left corner, use the constructor call::
+            
+            GGlyphLabel(text='LIVES 3',font_name='Arcade.ttf',font_size=20,x=10,y=680,
+                        halign='left',linecolor='black')
+        
+        This class supports the same keywords as :class:`GObject`, though ``width`` and
+        ``height`` are ignored, as well as ``text``, ``font_name``, ``font_size`` and
+        ``halign``.  The font defaults to the first font in ``HUD_FONTS``.
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._text  = ''
+        self._fname = keywords['font_name'] if 'font_name' in keywords else HUD_FONTS[0]
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 20
+        self._atlas = GlyphAtlas.get(self._fname,self._fsize)
+        self._mesh  = Mesh(vertices=[],indices=[],mode='triangles',texture=self._atlas.texture)
+        
+        self.text   = keywords['text'] if 'text' in keywords else ''
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        if not 'linecolor' in keywords:
+            keywords['linecolor'] = (0,0,0,1)
+        GObject.__init__(self,**keywords)
+        self._layout()
+        self._reset()
+        self._defined = True
+    
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+    
+    
+    # HIDDEN METHODS
+    def _layout(self):
+        """
+        Rewrites the mesh vertices for the current text.
+        
+        This method does not rebuild the drawing cache.  The width depends on the text,
+        so the bounding box (and that of any scene containing this label) is discarded.
+        """
+        self._invalidate()
+        width = self._atlas.measure(self._text)
+        if self._halign == 'left':
+            x = 0
+        elif self._halign == 'right':
+            x = -width
+        else:
+            x = -width/2.0
+        
+        vertices = []
+        indices  = []
+        self._atlas.layout(self._text,int(x),-self._atlas.line_height//2,vertices,indices)
+        self._mesh.vertices = vertices
+        self._mesh.indices  = indices
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        if not self._linecolor is None:
+            self._cache.add(self._linecolor)
+            self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
@@ -15,6 +15,17 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from cornell import Point2
+from collections import deque, namedtuple
+import time
+
+# A single input event.  The kind is one of 'key_down', 'key_up', 'touch_down', 
+# 'touch_move' or 'touch_up'.  Key events have a key name; touch events have (x,y).
+InputEvent = namedtuple('InputEvent',('time','kind','key','x','y'))
+
+# The input seen by one update.  The keys are those held at any time since the last 
+# update, pressed and released are the keys that went down or up since then, touch is
+# a Point2 or None, and events is a tuple of InputEvent.
+InputFrame = namedtuple('InputFrame',('time','keys','pressed','released','touch','events'))
 
 
 class GInput(object):
@@ -25,12 +36,26 @@ class GInput(object):
     to the user.  To access mouse information, simply access the attribute ``touch``.
     To access keyboard information, use the method :meth:`is_key_down`.
     
+    Every key and touch event is recorded with its time.  Before each call to ``update``,
+    the events since the last call are gathered into an immutable snapshot (the 
+    attribute ``frame``), and the input handler answers questions from that snapshot.
+    So the input cannot change in the middle of an update, and a key that is pressed
+    and released between two updates is still seen as down for one update.  The time 
+    from each event to the update that sees it is measured (see :meth:`latency_stats`).
+    
+    The input of a session may be recorded to a file, and played back later in place of
+    the keyboard and mouse (see the keywords ``record`` and ``playback`` of 
+    :class:`GameApp`).  During playback, the real keyboard and mouse are ignored.
+    
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly hook it up to the keyboard and mouse.  Instead, 
     you should only use the one provided in the `input` attribute of :class:`GameApp`. 
     See the documentation of that class for more information.
     """
     
+    # The number of events kept in the event history
+    EVENT_CAPACITY = 256
+    
     # MUTABLE ATTRIBUTES
     @property
     def touch_enabled(self):
@@ -88,14 +113,19 @@ class GInput(object):
         There is currently no way to get the location of the mouse when the button is not 
         pressed.  This a limitation of Kivy.
         
+        Like :meth:`is_key_down`, this value comes from the snapshot for the current 
+        update.
+        
         **Immutable**: This value cannot be altered.
         
         **Invariant**: Must be either a :class:`Point2` or None (if there is no touch).
         """
+        if not self._frame is None:
+            return self._frame.touch
         if self._touch is None:
             return None
         
-        return Point2(self._touch.x/dp(1),self._touch.y/dp(1))
+        return Point2(self._touch.x,self._touch.y)
     
     @property
     def key_count(self):
@@ -103,11 +133,14 @@ class GInput(object):
         The number of keys currently held down.
         
         This attribute is a quick way to check whether the user has pressed any keys.
+        Like :meth:`is_key_down`, it answers from the snapshot for the current update.
         
         **Immutable**: This value cannot be altered.
         
-        **Invariant**: Must be an int > 0."""
-        return self._keycount
+        **Invariant**: Must be an int >= 0."""
+        if self._frame is None:
+            return self._keycount
+        return len(self._frame.keys)
         
     @property
     def keys(self):
@@ -116,13 +149,75 @@ class GInput(object):
         
         Using this attribute is much slower than the method :meth:`is_key_down`.  You 
         should use that method when you want to test a specific key. This attribute is 
-        primarily for debugging.
+        primarily for debugging.  It answers from the snapshot for the current update.
         
         **Immutable**: This value cannot be altered.
         
         **Invariant**: Must be a list of strings (possibly empty)
         """
-        return tuple(k for (k,v) in self._keystate.items() if v)
+        if self._frame is None:
+            return tuple(k for (k,v) in self._keystate.items() if v)
+        return tuple(self._frame.keys)
+    
+    @property
+    def frame(self):
+        """
+        The snapshot of the input for the current update.
+        
+        This value is None before the first update.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an :class:`InputFrame` or None.
+        """
+        return self._frame
+    
+    @property
+    def events(self):
+        """
+        The input events since the last update, oldest first.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a tuple of :class:`InputEvent` (possibly empty).
+        """
+        return () if self._frame is None else self._frame.events
+    
+    @property
+    def history(self):
+        """
+        The most recent input events, oldest first.
+        
+        At most ``EVENT_CAPACITY`` events are kept.  This attribute is primarily for 
+        debugging.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a tuple of :class:`InputEvent` (possibly empty).
+        """
+        return tuple(self._history)
+    
+    @property
+    def playing(self):
+        """
+        Whether the input is being played back from a recording or script.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return not self._stream is None
+    
+    @property
+    def recording(self):
+        """
+        Whether the input is being recorded to a file.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return not self._writer is None
     
     
     # BUILT-IN METHODS
@@ -138,12 +233,20 @@ class GInput(object):
         self._view  = None
         self._touch = None
         self._keyboard = None
+        self._listener = None
         
         self._touch_enabled = True
         self._keyboard_enabled = True
         
         self._keystate = {}
         self._keycount = 0
+        
+        self._frame   = None
+        self._pending = deque(maxlen=GInput.EVENT_CAPACITY)
+        self._history = deque(maxlen=GInput.EVENT_CAPACITY)
+        self._latency = {'events':0, 'total':0.0, 'max':0.0, 'last':0.0}
+        self._stream  = None
+        self._writer  = None
     
     
     # PUBLIC METHODS
@@ -165,13 +268,42 @@ class GInput(object):
         For a complete list of key names, see the 
         `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
         
+        This method answers from the snapshot for the current update.  So it is also
+        True if the key was pressed and released since the last update.
+        
         :param key: the key to test
         :type key:  ``str``
         
         :return: True if ``key`` is currently held down
         :rtype:  ``bool``
         """
-        return key in self._keystate and self._keystate[key]
+        if self._frame is None:
+            return key in self._keystate and self._keystate[key]
+        return key in self._frame.keys
+    
+    def is_key_pressed(self,key):
+        """
+        Checks whether the key went down since the last update.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` was pressed since the last update
+        :rtype:  ``bool``
+        """
+        return not self._frame is None and key in self._frame.pressed
+    
+    def is_key_released(self,key):
+        """
+        Checks whether the key went up since the last update.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` was released since the last update
+        :rtype:  ``bool``
+        """
+        return not self._frame is None and key in self._frame.released
     
     def is_touch_down(self):
         """
@@ -183,21 +315,175 @@ class GInput(object):
         :return: True if the mouse is currently held down; False otherwise
         :rtype:  ``bool``
         """ 
-        return not self._touch is None
+        return not self.touch is None
+    
+    def latency_stats(self):
+        """
+        Returns: A dictionary of statistics for the input latency
+        
+        The latency of an event is the time from the event to the start of the update 
+        that first sees it.  The dictionary has the keys 'events' (the number of events
+        measured), 'mean', 'max' and 'last' (the latency of the most recent event).
+        """
+        stats = self._latency
+        mean  = stats['total']/stats['events'] if stats['events'] else 0.0
+        return {'events': stats['events'], 'mean': mean, 'max': stats['max'],
+                'last': stats['last']}
     
     
     # HIDDEN METHODS
-    def _register(self,view):
+    def _begin_frame(self,dt):
+        """
+        Returns: The time to give to the update
+        
+        This method gathers the events since the last update into a new snapshot.  It
+        is called by :class:`GameApp` before every update.
+        
+        During playback, the events (and time) of the next recorded update are used 
+        instead.  When the recording runs out, playback stops.  During recording, the 
+        events and time are written out.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if not self._stream is None:
+            try:
+                dt, script = next(self._stream)
+                for kind, key, x, y in script:
+                    self._apply(kind,key,x,y)
+            except StopIteration:
+                self._stream = None
+        
+        now = time.perf_counter()
+        events = tuple(self._pending)
+        self._pending.clear()
+        if not self._writer is None:
+            self._writer.write(dt,[(e.kind,e.key,e.x,e.y) for e in events])
+        
+        pressed  = frozenset(e.key for e in events if e.kind == 'key_down')
+        released = frozenset(e.key for e in events if e.kind == 'key_up')
+        held  = frozenset(k for (k,v) in self._keystate.items() if v)
+        touch = None
+        if not self._touch is None:
+            touch = Point2(self._touch.x,self._touch.y)
+        self._frame = InputFrame(now,held | pressed,pressed,released,touch,events)
+        
+        stats = self._latency
+        for e in events:
+            delay = now-e.time
+            stats['events'] += 1
+            stats['total']  += delay
+            stats['max'] = max(stats['max'],delay)
+        if events:
+            stats['last'] = now-events[-1].time
+        return dt
+    
+    def _play(self,stream):
+        """
+        Starts playing back the given input stream.
+        
+        The stream gives a (dt, events) pair for every update, where events is a 
+        sequence of (kind, key, x, y) tuples.  The keyboard and mouse are not connected
+        while the stream plays.
+        
+        :param stream: the input to play back
+        :type stream:  iterable of pairs, such as an :class:`InputReader`
+        """
+        self._stream = iter(stream)
+    
+    def _start_recording(self,writer):
+        """
+        Starts writing the input of every update with the given writer.
+        
+        :param writer: the recording to write to
+        :type writer:  :class:`InputWriter`
+        """
+        self._stop_recording()
+        self._writer = writer
+    
+    def _stop_recording(self):
+        """
+        Stops recording the input, closing the recording.
+        
+        This method does nothing if the input is not being recorded.
+        """
+        if not self._writer is None:
+            self._writer.close()
+            self._writer = None
+    
+    def _apply(self,kind,key=None,x=None,y=None):
+        """
+        Updates the input state for an event, and records it.
+        
+        A key press for a key that is already down (a key repeat) is ignored.
+        
+        :param kind: the kind of event
+        :type kind:  ``str``
+        
+        :param key: the key name (for key events)
+        :type key:  ``str`` or ``None``
+        
+        :param x: the horizontal coordinate (for touch events)
+        :type x:  ``float`` or ``None``
+        
+        :param y: the vertical coordinate (for touch events)
+        :type y:  ``float`` or ``None``
+        """
+        if kind == 'key_down':
+            # Need to handle the case where a release was dropped
+            if key in self._keystate and self._keystate[key]:
+                return
+            self._keycount += 1
+            self._keystate[key] = True
+        elif kind == 'key_up':
+            self._keystate[key] = False
+            self._keycount -= 1
+        elif kind == 'touch_up':
+            self._touch = None
+        else:
+            self._touch = Point2(x,y)
+        self._record(kind,key,x,y)
+    
+    def _record(self,kind,key=None,x=None,y=None):
+        """
+        Records an input event, and tells the listener (if any) about it.
+        
+        :param kind: the kind of event
+        :type kind:  ``str``
+        
+        :param key: the key name (for key events)
+        :type key:  ``str`` or ``None``
+        
+        :param x: the horizontal coordinate (for touch events)
+        :type x:  ``float`` or ``None``
+        
+        :param y: the vertical coordinate (for touch events)
+        :type y:  ``float`` or ``None``
+        """
+        event = InputEvent(time.perf_counter(),kind,key,x,y)
+        self._pending.append(event)
+        self._history.append(event)
+        self._notify()
+    
+    def _register(self,view,listener=None):
         """
         Registers the view with this input handler; activating it.
         
         The input handler can only have one view at a time.  If there is an active
         view, it will unregister it first before registering the new one.
         
+        The listener (if any) is called with no arguments on every key or touch event.
+        
         :param view: the view to register.
         :type view:  ``GView``
+        
+        :param listener: the function to notify of input events
+        :type listener:  callable or ``None``
         """
         self._view = view
+        self._listener = listener
+        if self.playing:
+            return
         if self.touch_enabled:
             self._enable_touch()
         if self.keyboard_enabled:
@@ -207,7 +493,7 @@ class GInput(object):
         """
         Enables touch events for this input handler
         """
-        if self._view is None:
+        if self._view is None or self.playing:
             return
         self._view.bind(on_touch_down=self._capture_touch)
         self._view.bind(on_touch_move=self._capture_touch)
@@ -228,7 +514,7 @@ class GInput(object):
         """
         Enables keyboard events for this input handler
         """
-        if self._view is None:
+        if self._view is None or self.playing:
             return
         from kivy.core.window import Window
         self._keyboard = Window.request_keyboard(self._disable_keyboard, self._view, 'text')
@@ -239,7 +525,7 @@ class GInput(object):
         """
         Disables keyboard events for this input handler
         """
-        if self._view is None:
+        if self._view is None or self._keyboard is None:
             return
         self._keyboard.unbind(on_key_down=self._capture_key)
         self._keyboard.unbind(on_key_up=self._release_key)
@@ -263,11 +549,7 @@ class GInput(object):
         :param modifiers: the modifiers associated with the press
         :type modifiers:  list of key codes
         """
-        k = keycode[1]
-        # Need to handle the case where a release was dropped
-        if not k in self._keystate or not self._keystate[k]:
-            self._keycount += 1
-        self._keystate[k] = True
+        self._apply('key_down',keycode[1])
         return True
     
     def _release_key(self, keyboard, keycode):
@@ -280,8 +562,7 @@ class GInput(object):
         :param keycode: the key released as a pair of int (keycode) and a name
         :type keycode:  (``int``, ``str``)
         """
-        self._keystate[keycode[1]] = False
-        self._keycount -= 1
+        self._apply('key_up',keycode[1])
         return True
     
     def _capture_touch(self,view,touch):
@@ -294,8 +575,8 @@ class GInput(object):
         :param touch: the information about the mouse press
         :type touch:  ``kivy.input.motionevent.TouchEvent``
         """
-        self._touch = touch
-        #self._touch.grab(self)
+        kind = 'touch_down' if self._touch is None else 'touch_move'
+        self._apply(kind,None,touch.x/dp(1),touch.y/dp(1))
     
     def _release_touch(self,view,touch):
         """
@@ -307,7 +588,118 @@ class GInput(object):
         :param touch: the information about the mouse release
         :type touch:  ``kivy.input.motionevent.TouchEvent``
         """
-        self._touch = None
+        self._apply('touch_up',None,touch.x/dp(1),touch.y/dp(1))
+    
+    def _notify(self):
+        """
+        Tells the listener (if any) that an input event arrived.
+        """
+        if not self._listener is None:
+            self._listener()
+
+
+# #mark -
+class _Layer(object):
+    """
+    A hidden class representing a single layer of a :class:`GView`.
+    
+    Every layer keeps the commands of the previous frame.  The commands drawn each frame
+    are compared to those of the previous frame (by identity), and the instruction group
+    is only changed where they differ.  So a frame that draws the same objects as the
+    last one leaves the canvas untouched.
+    
+    A dynamic layer is drawn directly in the window.  A static layer renders its commands
+    into an offscreen buffer (``Fbo``) that is drawn as one textured rectangle.  The 
+    buffer is rendered again only if the commands differ, or if one of them was changed.
+    """
+    
+    def __init__(self,name,static):
+        """
+        Creates a new, empty layer.
+        
+        :param name: The layer name
+        :type name:  ``str``
+        
+        :param static: Whether the layer is rendered offscreen
+        :type static:  ``bool``
+        """
+        self.name   = name
+        self.static = static
+        self.group  = InstructionGroup()
+        self.items  = []
+        self.cursor = 0
+        self.fbo    = None
+        self.clear  = (0,0,0,0)
+        self.changed = False
+    
+    def draw(self,cmd):
+        """
+        Adds the command to this layer.
+        
+        Drawing the same command as the previous frame (in the same order) does nothing.
+        
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+        """
+        if self.cursor < len(self.items) and self.items[self.cursor] is cmd:
+            self.cursor += 1
+            return
+        self.truncate()
+        self.cursor += 1
+        self.items.append(cmd)
+        self.group.add(cmd)
+        self.changed = True
+    
+    def truncate(self):
+        """
+        Removes the commands after the cursor (those not drawn again this frame).
+        """
+        if self.cursor < len(self.items):
+            for cmd in self.items[self.cursor:]:
+                self.group.remove(cmd)
+            del self.items[self.cursor:]
+            self.changed = True
+    
+    def reset(self):
+        """
+        Starts a new frame in this layer.
+        """
+        self.cursor  = 0
+        self.changed = False
+    
+    def build(self,canvas,pos,size):
+        """
+        Adds this layer to the given canvas.
+        
+        A static layer makes a new offscreen buffer of the given size.
+        
+        :param canvas: The canvas to add to
+        :type canvas:  ``kivy.graphics.Canvas``
+        
+        :param pos: The position of the view
+        :type pos:  pair of numbers
+        
+        :param size: The size of the view in pixels
+        :type size:  pair of numbers
+        """
+        if not self.static:
+            canvas.add(PushMatrix())
+            # Work-around for Retina Macs
+            canvas.add(Scale(dp(1),dp(1),dp(1)))
+            canvas.add(self.group)
+            canvas.add(PopMatrix())
+            return
+        
+        if not self.fbo is None:
+            self.fbo.remove(self.group)
+        self.fbo = Fbo(size=(max(1,int(size[0])),max(1,int(size[1]))))
+        self.fbo.add(ClearColor(*self.clear))
+        self.fbo.add(ClearBuffers())
+        self.fbo.add(Scale(dp(1),dp(1),dp(1)))
+        self.fbo.add(self.group)
+        canvas.add(self.fbo)
+        canvas.add(Color(1,1,1,1))
+        canvas.add(Rectangle(pos=pos,size=size,texture=self.fbo.texture))
 
 
 # #mark -
@@ -319,12 +711,49 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every 
     animation frame, as the game is constantly clearing the window.
     
+    The view is divided into named layers, drawn from bottom to top.  By default, there 
+    are two: the static layer 'background', which is solid white, and the dynamic layer 
+    'default'.  A dynamic layer is drawn directly to the window.  A static layer is 
+    rendered once into an offscreen buffer, and that buffer is drawn instead until the 
+    objects drawn in it change.  Objects that rarely change (such as a border, or a 
+    message) should be drawn to a static layer with ``obj.draw(view,'layer-name')``.  
+    In either case, everything must still be drawn every frame, as anything not drawn 
+    again is removed from the layer.
+    
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should 
     only use the one provided in the `view` attribute of :class:`GameApp`. 
     See the documentation of that class for more information.
     """
     
+    # IMMUTABLE PROPERTIES
+    @property
+    def layers(self):
+        """
+        The names of the layers in this view, from bottom to top.
+        
+        **Immutable**: This value cannot be altered.  Use :meth:`add_layer` instead.
+        
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(layer.name for layer in self._layers)
+    
+    @property
+    def changed(self):
+        """
+        Whether the last frame drew anything different from the frame before it.
+        
+        This only compares which objects were drawn (and in which order).  It does not
+        notice objects that changed while being drawn in the same place.  This value is
+        set by :meth:`flush`.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._changed
+    
+    
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -336,14 +765,19 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
-        self._frame = InstructionGroup()
+        background = _Layer('background',True)
+        background.clear = (1,1,1,1)
+        self._frame  = _Layer('default',False)
+        self._layers = [background,self._frame]
+        self._lookup = {'background':background,'default':self._frame}
+        self._changed = True
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
     
     
     # PUBLIC METHODS
-    def draw(self,cmd):
+    def draw(self,cmd,layer=None):
         """
         Draws the given Kivy graphics command to this view.
         
@@ -352,17 +786,66 @@ class GView(FloatLayout):
         
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
+        
+        :param layer: the layer to draw in (None for 'default')
+        :type layer:  ``str`` or ``None``
+        """
+        if layer is None:
+            self._frame.draw(cmd)
+        else:
+            assert layer in self._lookup, '%s is not a layer' % repr(layer)
+            self._lookup[layer].draw(cmd)
+    
+    def add_layer(self,name,static=False,below=None):
+        """
+        Adds a new layer to this view.
+        
+        The layer is placed on top of the existing layers, unless ``below`` is the name 
+        of a layer to put it under.
+        
+        :param name: the name of the new layer
+        :type name:  ``str`` (not the name of an existing layer)
+        
+        :param static: whether the layer is rendered offscreen (see above)
+        :type static:  ``bool``
+        
+        :param below: the layer to place the new layer under (or None)
+        :type below:  ``str`` or ``None``
         """
-        self._frame.add(cmd)
+        assert type(name) == str and not name in self._lookup, '%s is not a new layer name' % repr(name)
+        assert type(static) == bool, '%s is not a bool' % repr(static)
+        assert below is None or below in self._lookup, '%s is not a layer' % repr(below)
+        layer = _Layer(name,static)
+        if below is None:
+            self._layers.append(layer)
+        else:
+            self._layers.insert(self._layers.index(self._lookup[below]),layer)
+        self._lookup[name] = layer
+        self._reset()
     
     def clear(self):
         """
         Clears the contents of the view.
         
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  The layers
+        actually keep their contents until :meth:`flush`, so that the objects drawn
+        again are not removed and added back.
+        """
+        for layer in self._layers:
+            layer.reset()
+    
+    def flush(self):
+        """
+        Finishes the current frame of the view.
+        
+        This method is called for you automatically at the end of the animation frame.
+        It removes anything from the layers that was not drawn this frame.
         """
-        self._frame.clear()
+        self._changed = False
+        for layer in self._layers:
+            layer.truncate()
+            self._changed = self._changed or layer.changed
     
     
     # HIDDEN METHODS
@@ -371,8 +854,5 @@ class GView(FloatLayout):
         Resets the view canvas in response to a resizing event
         """
         self.canvas.clear()
-        self.canvas.add(Color(1,1,1))
-        self.canvas.add(Rectangle(pos=self.pos,size=self.size))
-        # Work-around for Retina Macs
-        self.canvas.add(Scale(dp(1),dp(1),dp(1)))
-        self.canvas.add(self._frame)
+        for layer in self._layers:
+            layer.build(self.canvas,self.pos,self.size)
@@ -0,0 +1,68 @@
+"""
+Headless drawing check for 2D games.
+
+This script draws a new wave of the game into a :class:`GSoftView`, with no window and
+no OpenGL context, and checks that the aliens (at the top of the frame) and the ship
+(at the bottom) were drawn.  Run it from the folder containing the game, as follows::
+    
+    python -m game2d.softcheck
+
+The script uses the 'mock' Kivy graphics backend, so it runs on a headless server.  It
+exits with status 1 if either half of the frame is blank.
+"""
+import os
+import sys
+import time
+
+# The number of game units per pixel of the frame
+CHECK_DOWNSCALE = 2
+# The number of frames drawn (and timed)
+CHECK_FRAMES = 20
+
+
+def check(folder,downscale=CHECK_DOWNSCALE,frames=CHECK_FRAMES):
+    """
+    Returns: True if a new wave draws into both halves of a software view
+    
+    This function prints the number of pixels drawn in each half of the frame, and the
+    average time to draw a frame.
+    
+    :param folder: The folder containing the game and its asset folders
+    :type folder:  ``str``
+    
+    :param downscale: The number of game units per pixel
+    :type downscale:  ``int`` > 0
+    
+    :param frames: The number of frames to draw
+    :type frames:  ``int`` > 0
+    """
+    assert type(frames) == int and frames > 0, '%s is not a valid number of frames' % repr(frames)
+    os.environ.setdefault('KIVY_GL_BACKEND','mock')
+    if not folder in sys.path:
+        sys.path.insert(0,folder)
+    
+    # The game module wave must be found before the standard library module
+    from wave import Wave
+    from consts import GAME_WIDTH, GAME_HEIGHT
+    from game2d import GameApp, GSoftView
+    GameApp.set_folder(folder)
+    
+    wave = Wave()
+    view = GSoftView(GAME_WIDTH,GAME_HEIGHT,downscale=downscale)
+    start = time.perf_counter()
+    for _ in range(frames):
+        view.clear()
+        wave.draw(view)
+    elapsed = (time.perf_counter()-start)/frames
+    
+    drawn = (view.frame[:,:,:3] != 255).any(axis=2)
+    middle = drawn.shape[0]//2
+    top = int(drawn[:middle].sum())
+    bottom = int(drawn[middle:].sum())
+    print('pixels drawn: %d top, %d bottom  (%.2f ms per frame)' % (top,bottom,elapsed*1000))
+    return top > 0 and bottom > 0
+
+
+if __name__ == '__main__':
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(0 if check(folder) else 1)
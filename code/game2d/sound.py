@@ -3,13 +3,251 @@ Sound classes for 2D game support.
 
 This classes wrap the Kivy audio interface, making it simpler for students to use.
 
+A :class:`Sound` is a single voice: it cannot overlap with itself.  A :class:`SoundPool`
+is a fixed set of voices for the same file, so that a sound effect may be played many
+times at once without loading the file again.
+
+Each WAV file is opened once, as a :class:`PCMBuffer` that memory-maps its samples to
+time the voices playing it.  The buffers are cached and shared, as are the voices: every
+:class:`Sound` for the same file borrows a voice from a single shared pool, so making a
+new sound for a file that has been seen before is almost free.
+
+The audio backend is only ever called from the :class:`AudioThread`.  Playing, stopping
+and loading a sound queue a command for that thread and return at once, so a slow audio
+backend never stalls an animation frame.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.core.audio import SoundLoader
 from .app import GameApp
+import os
+import mmap
+import queue
+import struct
+import threading
+import time
 
 
+# The RIFF header (tag, size, format)
+_RIFF  = struct.Struct('<4sI4s')
+# The start of a RIFF chunk (tag, size)
+_CHUNK = struct.Struct('<4sI')
+# The start of a fmt chunk (format, channels, rate, byte rate, block align, bits)
+_FORMAT = struct.Struct('<HHIIHH')
+# The sample formats that we can time (PCM, float and extensible)
+_PCM_FORMATS = (1, 3, 0xFFFE)
+
+
+class PCMBuffer(object):
+    """
+    A class representing the decoded samples of a WAV file.
+    
+    The samples are not copied into memory.  The file is memory-mapped, so its pages are
+    shared by every process reading it, and are only resident once they are touched.  The
+    buffer knows the format and length of the sound, so a voice playing it can be timed
+    without asking the audio backend.
+    
+    The audio backend can only load sounds from a file name, so it does not play these
+    samples.  Each voice loaded by the backend still decodes its own copy of the file.
+    
+    **You should never construct an object of this class yourself**.  Use the class 
+    method :meth:`get`, which caches one buffer per file.
+    """
+    
+    # Class attribute for the buffers of every file seen so far (None if not a WAV)
+    CACHE = {}
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for this buffer.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be a nonempty string.
+        """
+        return self._source
+    
+    @property
+    def channels(self):
+        """
+        The number of channels in each frame.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._channels
+    
+    @property
+    def rate(self):
+        """
+        The number of frames per second.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._rate
+    
+    @property
+    def bits(self):
+        """
+        The number of bits in each sample.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._bits
+    
+    @property
+    def frames(self):
+        """
+        The number of frames in the sound.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._length//self._align
+    
+    @property
+    def duration(self):
+        """
+        The length of the sound in seconds.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return self.frames/self._rate
+    
+    @property
+    def nbytes(self):
+        """
+        The number of bytes of samples.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._length
+    
+    @property
+    def samples(self):
+        """
+        The raw samples, as a read-only memoryview of the mapped file.
+        
+        **Immutable**: This value cannot be changed after the buffer is loaded.
+        
+        **Invariant**: Must be a memoryview of ``nbytes`` bytes.
+        """
+        return memoryview(self._map)[self._offset:self._offset+self._length]
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,path):
+        """
+        Maps the given WAV file and reads its format.
+        
+        :param path: The path to the WAV file
+        :type path:  ``str``
+        """
+        self._source = os.path.basename(path)
+        with open(path,'rb') as file:
+            try:
+                self._map = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+            except ValueError:
+                raise IOError('Module game2d cannot read the file %s' % repr(path))
+        
+        try:
+            self._parse(path)
+        except (struct.error, IOError):
+            self._map.close()
+            raise IOError('Module game2d cannot read the file %s' % repr(path))
+    
+    
+    # PUBLIC METHODS
+    def close(self):
+        """
+        Unmaps the file.
+        
+        The buffer may not be used afterwards.
+        """
+        self._map.close()
+    
+    
+    # CLASS METHODS
+    @classmethod
+    def get(cls,source):
+        """
+        Returns: The buffer for the given sound file, or None if it is not a WAV file
+        
+        The file is only mapped the first time it is asked for.
+        
+        :param source: The name of a file in the **Sounds** folder
+        :type source:  ``str``
+        """
+        if not source in cls.CACHE:
+            buffer = None
+            if source.lower().endswith('.wav'):
+                try:
+                    buffer = cls(os.path.join(GameApp.sounds,source))
+                except IOError:
+                    pass
+            cls.CACHE[source] = buffer
+        return cls.CACHE[source]
+    
+    @classmethod
+    def stats(cls):
+        """
+        Returns: A dictionary of statistics for the buffer cache
+        
+        The dictionary has the keys 'files' (the number of buffers) and 'mapped_bytes'
+        (the number of sample bytes mapped by them).  Mapped bytes are only resident once
+        they are read.  This does not count the audio backend, which keeps its own 
+        decoded copy of the file for every voice.
+        """
+        buffers = [x for x in cls.CACHE.values() if not x is None]
+        return {'files': len(buffers), 'mapped_bytes': sum(x.nbytes for x in buffers)}
+    
+    
+    # HIDDEN METHODS
+    def _parse(self,path):
+        """
+        Reads the format and finds the samples of the mapped file.
+        
+        :param path: The path to the WAV file
+        :type path:  ``str``
+        """
+        data = self._map
+        riff, size, wave = _RIFF.unpack_from(data,0)
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise IOError('%s is not a WAV file' % repr(path))
+        
+        self._channels = None
+        self._offset = None
+        offset = _RIFF.size
+        while offset+_CHUNK.size <= len(data):
+            tag, size = _CHUNK.unpack_from(data,offset)
+            offset += _CHUNK.size
+            if tag == b'fmt ':
+                format, self._channels, self._rate, _, self._align, self._bits = \
+                    _FORMAT.unpack_from(data,offset)
+                if not format in _PCM_FORMATS:
+                    raise IOError('%s is a compressed WAV file' % repr(path))
+            elif tag == b'data':
+                self._offset = offset
+                self._length = min(size,len(data)-offset)
+            offset += size+(size & 1)
+        
+        if self._channels is None or self._offset is None or not self._rate or not self._align:
+            raise IOError('%s is not a WAV file' % repr(path))
+
+
+# #mark -
 class Sound(object):
     """
     A class representing a sound object that can be played.
@@ -20,12 +258,19 @@ class Sound(object):
     **Sounds** directory.  Sounds in that folder can be referenced directly by name.
     
     When a sound is played, it cannot be played again until it finishes, or is stopped.  
-    This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    If you want multiple, simultaneous sound effects from the same WAV file, use a
+    :class:`SoundPool` instead.
+    
+    A sound does not load the file itself.  It borrows a voice from the pool shared by 
+    every sound for the same file (see :meth:`SoundPool.get`), so sounds are cheap to 
+    make.  Use :meth:`preload` to load the voices before the game starts.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
     
+    # Class attribute for sounds loaded ahead of time by the asset preloader
+    PRELOADED = {}
+    
     # MUTABLE PROPERTIES
     @property
     def volume(self):
@@ -36,13 +281,14 @@ class Sound(object):
         
         **Invariant**: Must float in the range 0..1.
         """
-        return self._sound.volume
+        return self._volume
     
     @volume.setter
     def volume(self,value):
         assert type(value) in [int, float] and value >= 0 and value <= 1, \
             'value %s is not a valid volume' % repr(value)
-        self._sound.volume = value
+        self._volume = value
+        self._pool._set_volume(self._token,value)
     
     # IMMUTABLE PROPERTIES
     @property
@@ -66,7 +312,7 @@ class Sound(object):
         
         **Invariant**: Must be a boolean.
         """ 
-        return self._sound.state == 'play'
+        return self._pool._playing(self._token)
     
     def __init__(self,source):
         """
@@ -75,12 +321,11 @@ class Sound(object):
         :param source: The string providing the name of a sound file
         :type source:  ``str``
         """
-        from .app import GameApp
         assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
         self._source = source
-        self._sound  = SoundLoader.load(source)
-        if self._sound is None:
-            raise IOError('Module game2d cannot read the file %s' % repr(source))
+        self._volume = 1.0
+        self._token  = 0
+        self._pool   = SoundPool.get(source)
     
     def play(self,loop=False):
         """
@@ -91,8 +336,8 @@ class Sound(object):
         :param loop: Whether or not to loop the sound
         :type loop:  ``bool``
         """
-        self._sound.loop = loop
-        self._sound.play()
+        self._pool._stop(self._token)
+        self._token = self._pool._start(loop,self._volume)
 
     def stop(self):
         """
@@ -100,7 +345,409 @@ class Sound(object):
         
         This will stop the sound immediately, even if it is looping.
         """
-        self._sound.stop()
+        self._pool._stop(self._token)
+    
+    # CLASS METHODS
+    @classmethod
+    def preload(cls,sources,polyphony=None):
+        """
+        Loads the given sound files now, rather than when they are first played.
+        
+        Each file is mapped into the buffer cache, and its shared pool is given all of 
+        its voices.  The voices are loaded by the :class:`AudioThread`, so this method 
+        returns before they are ready.
+        
+        :param sources: The names of the sound files
+        :type sources:  iterable of ``str``
+        
+        :param polyphony: The number of voices for each file (None for the default)
+        :type polyphony:  ``int`` > 0 or ``None``
+        """
+        for source in sources:
+            _shared_pool(source,polyphony)
+
+
+# #mark -
+class SoundPool(object):
+    """
+    A class representing a sound that can be played several times at once.
+    
+    A sound pool has a fixed number of voices for a single file.  Each call to 
+    :meth:`play` starts a voice that is not playing.  If every voice is busy, the voice 
+    that started first is stopped and restarted (it is "stolen").  So the sound never 
+    plays more than ``polyphony`` times at once.
+    
+    When the file is a WAV, the pool times each voice with the length of its 
+    :class:`PCMBuffer`, rather than asking the audio backend whether it is still playing.
+    
+    There is one shared pool for each file, given by :meth:`get`.  It is used by every 
+    :class:`Sound` and :class:`SoundLibrary` for that file, and loads its voices as they 
+    are first needed.  A pool made with the constructor queues all of its voices to load
+    at once, so playing it never loads a file.
+    
+    A sound pool has the same methods and attributes as :class:`Sound`, so either may
+    be used in a :class:`SoundLibrary`.
+    """
+    # Class attribute for the shared pool of every file
+    POOLS = {}
+    # The number of voices in a shared pool, unless asked for more
+    POLYPHONY = 4
+    
+    # MUTABLE PROPERTIES
+    @property
+    def volume(self):
+        """
+        The volume of every voice in this pool.
+        
+        1 means full volume, 0 means mute.  The default value is 1.  Voices started by 
+        a :class:`Sound` keep the volume of that sound.
+        
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+    
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+        for index in range(len(self._voices)):
+            if self._loaded[index] and not self._shared[index]:
+                AudioThread.get().push(self._backend_volume,index,value)
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for this sound. 
+        
+        **Immutable**: This value cannot be changed after the sound is loaded.
+        
+        **Invariant**: Must be a nonempty string.
+        """ 
+        return self._source
+    
+    @property
+    def buffer(self):
+        """
+        The samples of the source file, or None if it is not a WAV file.
+        
+        **Immutable**: This value cannot be changed after the sound is loaded.
+        
+        **Invariant**: Must be a :class:`PCMBuffer` or None.
+        """ 
+        return self._buffer
+    
+    @property
+    def polyphony(self):
+        """
+        The number of voices in this pool.
+        
+        **Immutable**: This value cannot be changed after the sound is loaded.
+        
+        **Invariant**: Must be an int > 0.
+        """ 
+        return len(self._voices)
+    
+    @property
+    def playing(self):
+        """
+        Whether or not any voice is currently playing.
+        
+        **Immutable**: This value cannot be changed.  You should use the :meth:`play` 
+        and :meth:`stop` methods to alter its value.
+        
+        **Invariant**: Must be a boolean.
+        """ 
+        return self.active > 0
+    
+    @property
+    def active(self):
+        """
+        The number of voices currently playing.
+        
+        **Immutable**: This value cannot be changed.
+        
+        **Invariant**: Must be an int in 0..polyphony.
+        """ 
+        now = time.perf_counter()
+        return sum(1 for index in range(len(self._voices)) if self._busy(index,now))
+    
+    def __init__(self,source,polyphony=4,preload=True):
+        """
+        Creates a new sound pool.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        
+        :param polyphony: The number of voices
+        :type polyphony:  ``int`` > 0
+        
+        :param preload: Whether to queue all of the voices to load now
+        :type preload:  ``bool``
+        """
+        assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
+        assert type(polyphony) == int and polyphony > 0, '%s is not a valid polyphony' % repr(polyphony)
+        self._source = source
+        self._buffer = PCMBuffer.get(source)
+        self._volume = 1.0
+        self._voices = []
+        self._loaded = []
+        self._tokens = []
+        self._shared = []
+        self._starts = []
+        self._ends   = []
+        self._serial = 0
+        self._plays  = 0
+        self._steals = 0
+        self._grow(polyphony)
+        if preload:
+            self._load()
+    
+    def play(self,loop=False):
+        """
+        Plays this sound on a free voice, or steals the oldest voice.
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        self._start(loop,None)
+    
+    def stop(self):
+        """
+        Stops every voice of this sound.
+        
+        This will stop the voices immediately, even if they are looping.
+        """
+        for token in self._tokens:
+            self._stop(token)
+    
+    def stats(self):
+        """
+        Returns: A dictionary of statistics for this pool
+        
+        The dictionary has the keys 'polyphony', 'active', 'loaded' (the number of voices
+        loaded so far), 'plays' and 'steals' (the number of plays that had to stop another
+        voice).
+        """
+        loaded = sum(1 for voice in self._voices if not voice is None)
+        return {'polyphony': self.polyphony, 'active': self.active, 'loaded': loaded,
+                'plays': self._plays, 'steals': self._steals}
+    
+    # CLASS METHODS
+    @classmethod
+    def get(cls,source,polyphony=None):
+        """
+        Returns: The shared pool for the given sound file
+        
+        The pool is created (without loading any voices) the first time the file is 
+        asked for.  If a later call asks for more voices, the pool is grown to fit.
+        
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        
+        :param polyphony: The least number of voices (None for ``POLYPHONY``)
+        :type polyphony:  ``int`` > 0 or ``None``
+        """
+        polyphony = cls.POLYPHONY if polyphony is None else polyphony
+        if not source in cls.POOLS:
+            cls.POOLS[source] = cls(source,polyphony,False)
+        else:
+            cls.POOLS[source]._grow(polyphony)
+        return cls.POOLS[source]
+    
+    # HIDDEN METHODS
+    def _grow(self,polyphony):
+        """
+        Adds (unloaded) voices until this pool has at least the given number.
+        
+        :param polyphony: The least number of voices
+        :type polyphony:  ``int`` > 0
+        """
+        assert type(polyphony) == int and polyphony > 0, '%s is not a valid polyphony' % repr(polyphony)
+        extra = polyphony-len(self._voices)
+        if extra > 0:
+            self._voices += [None]*extra
+            self._loaded += [False]*extra
+            self._tokens += [0]*extra
+            self._shared += [False]*extra
+            self._starts += [0.0]*extra
+            self._ends   += [0.0]*extra
+    
+    def _load(self):
+        """
+        Queues the loading of every voice of this pool that is not yet loaded.
+        """
+        for index in range(len(self._voices)):
+            if not self._loaded[index]:
+                self._loaded[index] = True
+                AudioThread.get().push(self._backend_load,index)
+    
+    def _busy(self,index,now):
+        """
+        Returns: True if the given voice is playing at the given time
+        
+        :param index: The voice position
+        :type index:  ``int``
+        
+        :param now: The current time
+        :type now:  ``float``
+        """
+        if not self._tokens[index]:
+            return False
+        elif self._buffer is None:
+            voice = self._voices[index]
+            return not voice is None and voice.state == 'play'
+        return now < self._ends[index]
+    
+    def _find(self,token):
+        """
+        Returns: The position of the voice started with the given token, or None
+        
+        :param token: The token returned by :meth:`_start`
+        :type token:  ``int``
+        """
+        if token:
+            for index, owner in enumerate(self._tokens):
+                if owner == token:
+                    return index
+        return None
+    
+    def _start(self,loop,volume):
+        """
+        Returns: The token identifying the voice started
+        
+        The voice is the first one that is not playing, loaded if needed.  If every
+        voice is busy, the voice that started first is stolen.  The voice is started by
+        the audio thread, so this method does not wait for the backend.
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        
+        :param volume: The volume of the voice (None for the pool volume)
+        :type volume:  ``float`` or ``None``
+        """
+        now = time.perf_counter()
+        index = None
+        for pos in range(len(self._voices)):
+            if not self._busy(pos,now):
+                index = pos
+                break
+        if index is None:
+            index = self._starts.index(min(self._starts))
+            self._steals += 1
+        if not self._loaded[index]:
+            self._loaded[index] = True
+            AudioThread.get().push(self._backend_load,index)
+        
+        # A voice started by a Sound keeps the volume of that sound
+        shared = not volume is None
+        volume = self._volume if volume is None else volume
+        AudioThread.get().push(self._backend_play,index,volume,loop)
+        
+        self._serial += 1
+        self._tokens[index] = self._serial
+        self._shared[index] = shared
+        self._starts[index] = now
+        if loop or self._buffer is None:
+            self._ends[index] = float('inf')
+        else:
+            self._ends[index] = now+self._buffer.duration
+        self._plays += 1
+        return self._serial
+    
+    def _stop(self,token):
+        """
+        Stops the voice started with the given token, if it is still playing.
+        
+        :param token: The token returned by :meth:`_start`
+        :type token:  ``int``
+        """
+        index = self._find(token)
+        if not index is None:
+            if self._busy(index,time.perf_counter()):
+                AudioThread.get().push(self._backend_stop,index)
+            self._tokens[index] = 0
+    
+    def _playing(self,token):
+        """
+        Returns: True if the voice started with the given token is still playing
+        
+        :param token: The token returned by :meth:`_start`
+        :type token:  ``int``
+        """
+        index = self._find(token)
+        return not index is None and self._busy(index,time.perf_counter())
+    
+    def _set_volume(self,token,value):
+        """
+        Sets the volume of the voice started with the given token, if it still has it.
+        
+        :param token: The token returned by :meth:`_start`
+        :type token:  ``int``
+        
+        :param value: The new volume
+        :type value:  ``float`` in 0..1
+        """
+        index = self._find(token)
+        if not index is None:
+            AudioThread.get().push(self._backend_volume,index,value)
+    
+    # The methods below are only called on the audio thread
+    def _backend_load(self,index):
+        """
+        Loads the given voice.
+        
+        :param index: The voice position
+        :type index:  ``int``
+        """
+        self._voices[index] = _load_voice(self._source)
+    
+    def _backend_play(self,index,volume,loop):
+        """
+        Restarts the given voice, if it is loaded.
+        
+        :param index: The voice position
+        :type index:  ``int``
+        
+        :param volume: The volume of the voice
+        :type volume:  ``float`` in 0..1
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        voice = self._voices[index]
+        if not voice is None:
+            if voice.state == 'play':
+                voice.stop()
+            voice.volume = volume
+            voice.loop = loop
+            voice.play()
+    
+    def _backend_stop(self,index):
+        """
+        Stops the given voice, if it is loaded.
+        
+        :param index: The voice position
+        :type index:  ``int``
+        """
+        voice = self._voices[index]
+        if not voice is None:
+            voice.stop()
+    
+    def _backend_volume(self,index,value):
+        """
+        Sets the volume of the given voice, if it is loaded.
+        
+        :param index: The voice position
+        :type index:  ``int``
+        
+        :param value: The new volume
+        :type value:  ``float`` in 0..1
+        """
+        voice = self._voices[index]
+        if not voice is None:
+            voice.volume = value
 
 
 # #mark -
@@ -118,13 +765,23 @@ class SoundLibrary(object):
     To play the sound, we access it as follows::
         
         soundlib['soundname'].play()
+    
+    Each sound in the library is the shared :class:`SoundPool` for its file, with at
+    least ``polyphony`` voices, so it may be played again before it finishes.  Assigning
+    a sound queues the loading of all its voices on the :class:`AudioThread` and returns
+    at once.  Use :meth:`load` to give a sound a different number of voices.
     """
     
-    def __init__(self):
+    def __init__(self,polyphony=4):
         """
         Creates a new, empty sound library.
+        
+        :param polyphony: The number of voices for each sound
+        :type polyphony:  ``int`` > 0
         """
+        assert type(polyphony) == int and polyphony > 0, '%s is not a valid polyphony' % repr(polyphony)
         self._data = {}
+        self._polyphony = polyphony
     
     def __len__(self):
         """
@@ -155,7 +812,7 @@ class SoundLibrary(object):
         :param filename: The name of the file containing the sound source
         :type filename:  ``str``
         """
-        self._data[key] = Sound(filename)
+        self._data[key] = _shared_pool(filename,self._polyphony)
     
     def __delitem__(self, key):
         """
@@ -179,3 +836,207 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+    
+    def load(self, key, filename, polyphony=None):
+        """
+        Assigns the shared sound pool for the file filename to the given name.
+        
+        :param key: The key identifying a sound object
+        :type key:  ``str``
+        
+        :param filename: The name of the file containing the sound source
+        :type filename:  ``str``
+        
+        :param polyphony: The number of voices (None for the library default)
+        :type polyphony:  ``int`` > 0 or ``None``
+        """
+        self._data[key] = _shared_pool(filename,self._polyphony if polyphony is None else polyphony)
+
+
+# #mark -
+class AudioThread(object):
+    """
+    A class that calls the audio backend on a thread of its own.
+    
+    Sounds do not call the audio backend themselves.  They push commands (a function and
+    its arguments) onto the queue of this thread, which runs them in order.  So the game
+    never waits on the backend, and loading a sound file does not stall a frame.
+    
+    The thread measures the queue it serves: its depth, and the latency of each command
+    (the time from being pushed to being finished).  A command that fails is counted,
+    and the error is kept in :attr:`error`; the commands after it still run.
+    
+    **You should never construct an object of this class yourself**.  Use the class 
+    method :meth:`get`, which starts the single audio thread the first time it is used.
+    """
+    # Class attribute for the audio thread (None until first used)
+    INSTANCE = None
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def depth(self):
+        """
+        The number of commands waiting to run.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._queue.qsize()
+    
+    @property
+    def latency(self):
+        """
+        The average time in seconds from pushing a command to finishing it.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._latency/self._commands if self._commands else 0.0
+    
+    @property
+    def error(self):
+        """
+        The error raised by the last command that failed (or None).
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Must be an exception or None.
+        """
+        return self._error
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates and starts the audio thread.
+        """
+        self._queue    = queue.Queue()
+        self._pushed   = 0
+        self._commands = 0
+        self._failed   = 0
+        self._deepest  = 0
+        self._latency  = 0.0
+        self._slowest  = 0.0
+        self._error    = None
+        self._thread = threading.Thread(target=self._run,name='game2d-audio')
+        self._thread.daemon = True
+        self._thread.start()
+    
+    
+    # PUBLIC METHODS
+    def push(self,function,*args):
+        """
+        Queues a call to the given function on the audio thread.
+        
+        :param function: The function to call
+        :type function:  callable
+        
+        :param args: The arguments of the function
+        :type args:  any
+        """
+        self._queue.put((time.perf_counter(),function,args))
+        self._pushed += 1
+        self._deepest = max(self._deepest,self._queue.qsize())
+    
+    def flush(self):
+        """
+        Waits until every command queued so far has run.
+        """
+        self._queue.join()
+    
+    def stats(self):
+        """
+        Returns: A dictionary of statistics for the audio thread
+        
+        The dictionary has the keys 'depth' (the commands waiting), 'depth_max', 
+        'pushed', 'commands' (the number run), 'failed', 'latency' (the average time 
+        from push to finish) and 'latency_max'.
+        """
+        return {'depth': self.depth, 'depth_max': self._deepest, 'pushed': self._pushed,
+                'commands': self._commands, 'failed': self._failed,
+                'latency': self.latency, 'latency_max': self._slowest}
+    
+    
+    # CLASS METHODS
+    @classmethod
+    def get(cls):
+        """
+        Returns: The audio thread, starting it if necessary
+        """
+        if cls.INSTANCE is None:
+            cls.INSTANCE = cls()
+        return cls.INSTANCE
+    
+    @classmethod
+    def shutdown(cls):
+        """
+        Runs the commands still queued, and then stops the audio thread.
+        
+        This method does nothing if the audio thread was never started.  It is called
+        for you when the game stops.
+        """
+        if not cls.INSTANCE is None:
+            cls.INSTANCE._queue.put(None)
+            cls.INSTANCE._thread.join()
+            cls.INSTANCE = None
+    
+    
+    # HIDDEN METHODS
+    def _run(self):
+        """
+        Runs the queued commands until the thread is shut down.
+        
+        This method runs on the audio thread.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            stamp, function, args = item
+            try:
+                function(*args)
+            except Exception as e:
+                self._error = e
+                self._failed += 1
+            delay = time.perf_counter()-stamp
+            self._latency += delay
+            self._slowest  = max(self._slowest,delay)
+            self._commands += 1
+            self._queue.task_done()
+
+
+def _load_voice(source):
+    """
+    Returns: A new Kivy sound for the given file
+    
+    Sounds loaded by the asset preloader are used first.
+    
+    :param source: The name of the sound file
+    :type source:  ``str``
+    """
+    if Sound.PRELOADED.get(source):
+        voice = Sound.PRELOADED[source].pop()
+    else:
+        from kivy.core.audio import SoundLoader
+        voice = SoundLoader.load(source)
+    if voice is None:
+        raise IOError('Module game2d cannot read the file %s' % repr(source))
+    return voice
+
+
+def _shared_pool(source,polyphony):
+    """
+    Returns: The shared pool for the given file, with all of its voices queued to load
+    
+    :param source: The name of the sound file
+    :type source:  ``str``
+    
+    :param polyphony: The least number of voices
+    :type polyphony:  ``int`` > 0
+    """
+    pool = SoundPool.get(source,polyphony)
+    pool._load()
+    return pool
@@ -23,7 +23,7 @@ Hartek Sabharwal hs786
 3 Dec 2017
 """
 from consts import *
-from game2d import *
+from game2d import GImage, GSprite, GRectangle, set_transforms
 import math
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other
@@ -148,23 +148,8 @@ class Ship(GImage):
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        for n in [[0,0],[0,1],[1,0],[1,1]]: #This checks all 4 corners
-            if bolt.getxVelocity() != 0: #does the math for a tilted bolt
-                x = -BOLT_WIDTH/2+BOLT_WIDTH*n[0]
-                y = -BOLT_HEIGHT/2+BOLT_HEIGHT*n[1]
-                angle = math.atan(bolt.getyVelocity()/bolt.getxVelocity())
-                rotatedX = (x*math.cos(angle) - y*math.sin(angle))+bolt.getX()
-                rotatedY = (x*math.sin(angle) - y*math.cos(angle))+bolt.getY()
-                if self.contains(tuple([rotatedX,
-                                        rotatedY])) and bolt.getyVelocity()<0:
-                    return True
-            else:
-                if self.contains(tuple([bolt.getX()-BOLT_WIDTH/2 + \
-                                        BOLT_WIDTH*n[0], bolt.getY() - \
-                                        BOLT_HEIGHT/2+BOLT_HEIGHT*n[1]])
-                                 ) and bolt.getyVelocity()<0:
-                    return True
-        return False
+        return bolt.getyVelocity()<0 and \
+            bool(self.contains_many(bolt.getCorners()).any())
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
@@ -188,8 +173,6 @@ class Alien(GSprite):
     attributes, list them below.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-        _counter:  counts the number of times a call has been made to setFrame.
-                    [int greater than or equal to 0]
     """
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getX(self):
@@ -224,6 +207,30 @@ class Alien(GSprite):
         """
         self.y = min(GAME_HEIGHT-ALIEN_CEILING-ALIEN_HEIGHT//2, y)
     
+    @staticmethod
+    def shiftAll(aliens, x, y):
+        """
+        Moves every alien in aliens by the same amount.
+        
+        This is the same as calling setX and setY on each alien (including the
+        ceiling limit in setY), but it moves the whole group at once, which is
+        much faster for a full wave.
+        
+        Parameter aliens: the aliens to move
+        Precondition: aliens is a list of Alien objects (possibly empty)
+        
+        Parameter x: the horizontal pixel distance to move the aliens
+        Precondition: x is an int or float
+        
+        Parameter y: the vertical pixel distance to move the aliens (up)
+        Precondition: y is an int or float
+        """
+        import numpy as np
+        xs = np.array([alien.x for alien in aliens], dtype=float)+x
+        ys = np.minimum(GAME_HEIGHT-ALIEN_CEILING-ALIEN_HEIGHT//2,
+                        np.array([alien.y for alien in aliens], dtype=float)+y)
+        set_transforms(aliens, xs, ys)
+    
     def getFrame(self):
         """
         Returns the frame attribute inherent in GSprite objects.
@@ -234,25 +241,18 @@ class Alien(GSprite):
         """
         Sets the frame attribute of the Alien sprite.
         
-        If setting the frame to one of the explosion frames (2 to 5), the
-        function actually only changes the frame every third function call. That
-        is the purpose of the _counter attribute. It is a cheap way to slow down
-        the animation rate of the explosions.
+        Explosions are animated by the particle systems in Wave, so an Alien
+        only shows its two walking frames.
         
         Parameter frame: the frame to set the Alien to
-        Precondition: frame is an int between 0 and 5 inclusive.
+        Precondition: frame is 0 or 1
         """
-        self._counter +=1 
-        if frame > 1: 
-            if (self._counter%EXPLOSION_SPEED == 0):
-                self.frame = frame
-        else:
-            self.frame = frame
+        self.frame = frame
         
     # INITIALIZER TO CREATE AN ALIEN
     def __init__(self, x, y, alienType):
         """
-        Initializes the Alien as a GSprite object. _counter set to 0.
+        Initializes the Alien as a GSprite object.
     
         Parameter x: The x coordinate to put the middle of the Alien at
         Precondition: x is a number (int or float)
@@ -265,7 +265,6 @@ class Alien(GSprite):
         """
         super().__init__(x=x, y=y,width=ALIEN_WIDTH,height=ALIEN_HEIGHT,
                          source=ALIEN_STRIP_IMAGES[alienType],format=(3,2))
-        self._counter = 0
         
     # METHOD TO CHECK FOR COLLISION (IF DESIRED)
     def collides(self,bolt):
@@ -280,23 +279,8 @@ class Alien(GSprite):
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        for n in [[0,0],[0,1],[1,0],[1,1]]: #This checks all 4 corners
-            if bolt.getxVelocity() != 0:
-                x = -BOLT_WIDTH/2+BOLT_WIDTH*n[0]
-                y = -BOLT_HEIGHT/2+BOLT_HEIGHT*n[1]
-                angle = math.atan(bolt.getyVelocity()/bolt.getxVelocity())
-                rotatedX = (x*math.cos(angle) - y*math.sin(angle))+bolt.getX()
-                rotatedY = (x*math.sin(angle) - y*math.cos(angle))+bolt.getY()
-                if self.contains(tuple([rotatedX,rotatedY])) and \
-                                                bolt.getyVelocity()>0:
-                    return True
-            else:
-                if self.contains(tuple([bolt.getX()-BOLT_WIDTH/2 + \
-                                        BOLT_WIDTH*n[0], bolt.getY() - \
-                                        BOLT_HEIGHT/2+BOLT_HEIGHT*n[1]])
-                                 ) and bolt.getyVelocity()>0:
-                    return True
-        return False
+        return bolt.getyVelocity()>0 and \
+            bool(self.contains_many(bolt.getCorners()).any())
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
@@ -372,6 +356,38 @@ class Bolt(GRectangle):
         Precondition: x is a number (int or float)
         """
         self.x = x
+    
+    def getCorners(self):
+        """
+        Returns the 4 corners of the bolt as a numpy array of shape (4,2).
+        
+        If the bolt is moving sideways, the corners are rotated to match the
+        direction of the bolt.
+        """
+        import numpy as np
+        xs = np.array([-BOLT_WIDTH/2,-BOLT_WIDTH/2,BOLT_WIDTH/2,BOLT_WIDTH/2])
+        ys = np.array([-BOLT_HEIGHT/2,BOLT_HEIGHT/2,-BOLT_HEIGHT/2,BOLT_HEIGHT/2])
+        if self._xVelocity != 0: #does the math for a tilted bolt
+            angle = math.atan(self._yVelocity/self._xVelocity)
+            xs, ys = (xs*math.cos(angle) - ys*math.sin(angle)), \
+                     (xs*math.sin(angle) - ys*math.cos(angle))
+        return np.column_stack((xs+self.x,ys+self.y))
+    
+    @staticmethod
+    def moveAll(bolts):
+        """
+        Moves every bolt in bolts by its velocity.
+        
+        This is the same as adding the velocities to the positions of each
+        bolt with setX and setY, but it moves the whole group at once.
+        
+        Parameter bolts: the bolts to move
+        Precondition: bolts is a list of Bolt objects (possibly empty)
+        """
+        import numpy as np
+        xs = np.array([bolt.x+bolt._xVelocity for bolt in bolts], dtype=float)
+        ys = np.array([bolt.y+bolt._yVelocity for bolt in bolts], dtype=float)
+        set_transforms(bolts, xs, ys)
         
     # INITIALIZER TO SET THE VELOCITY
     def __init__(self, x, y, xVelocity, yVelocity, rotation):
@@ -26,7 +26,7 @@ No code was copied, I just needed the formulas.
 Hartek Sabharwal hs786
 3 Dec 2017
 """
-from game2d import *
+from game2d import GPath, GParticles
 from consts import *
 from models import *
 import random
@@ -82,10 +82,11 @@ class Wave(object):
         _waveState:         the current state of the game represented as a value
                             from consts.py
                     [one of IN_PROGRESS, WAVE_WON, WAVE_LOST]
-        _exploded:          1d list of aliens that were killed by a bolt and are
-                            now going through the 4 explosion animation frames.
-                            Removed after the animation.
-                    [list of Alien or None]
+        _explosions:        the explosions of aliens killed by a bolt, one
+                            particle system per alien filmstrip. Each explosion
+                            plays the 4 explosion animation frames and is then
+                            removed.
+                    [list of 3 GParticles]
         _boss:              the boss alien that appears at the end of the wave
                     [Boss type object or None]
         _bossLives:         the number of lives the boss alien has
@@ -134,7 +135,10 @@ class Wave(object):
         Also it makes a function call to create the grid of Aliens.
         """
         self._aliens=[]
-        self._exploded = []
+        self._explosions = [GParticles(source=ALIEN_STRIP_IMAGES[i],format=(3,2),
+                                       width=ALIEN_WIDTH,height=ALIEN_HEIGHT,
+                                       frames=(2,5),frame_time=EXPLOSION_FRAME_TIME)
+                            for i in range(3)]
         self._boss = None
         self.__makeAliens()
         self._ship = Ship()
@@ -177,32 +181,36 @@ class Wave(object):
         self.__collisionHandler()
         if self.__checkCompletion():
             self._boss = Boss(GAME_WIDTH/2, GAME_HEIGHT+DEFENSE_LINE/2)
-        self.__explosionHandler()
+        self.__explosionHandler(dt)
         self.__boltController(keyList[2])
         self.__bossController(dt)
 
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw(self,view):
+    def draw(self,view,static=None):
         """
         Draws all the game objects to view.
         
         Draws every alien still alive in _aliens, the ship if it exists, the
         defense line, the boss if the player has gotten to that stage, and the
-        bolts in _bolts.
+        bolts in _bolts. The defense line never changes, so it is drawn in the
+        layer static of the view, if there is one.
         
         Parameter view: the game view, used in drawing 
         Precondition: instance of GView
+        
+        Parameter static: the name of a static layer for the defense line
+        Precondition: a layer name of view, or None for the default layer
         """
         for row in self._aliens:
             for alien in row:
                 if not (alien is None):
                     alien.draw(view)
-        for alien in self._exploded:
-            alien.draw(view)
+        for explosion in self._explosions:
+            explosion.draw(view)
         if not (self._ship is None):
             self._ship.draw(view)
-        self._dline.draw(view)
+        self._dline.draw(view,static)
         for bolt in self._bolts:
             bolt.draw(view)
         if not self._boss is None:
@@ -310,12 +318,14 @@ class Wave(object):
         Parameter y: the vertical pixel to move all the aliens down (negated)
         Precondition: y is an int or float
         """
+        alive = []
         for row in self._aliens:
             for alien in row:
                 if not alien is None:
-                    alien.setX(alien.getX() + x)
-                    alien.setY(alien.getY() - y)
-                    alien.setFrame((alien.getFrame()+1)%2)
+                    alive.append(alien)
+        Alien.shiftAll(alive, x, -y)
+        for alien in alive:
+            alien.setFrame((alien.getFrame()+1)%2)
                     
     def __boltController(self, fire):
         """
@@ -340,14 +350,11 @@ class Wave(object):
         Precondition: fire is True if spacebar is pressed, False otherwise.
         """
         playerBolt = False
+        Bolt.moveAll(self._bolts)
         n = 0
         while n < len(self._bolts):
             if self._bolts[n].getyVelocity()>0:
                 playerBolt = True
-            self._bolts[n].setY(self._bolts[n].getY() \
-                                + self._bolts[n].getyVelocity())
-            self._bolts[n].setX(self._bolts[n].getX() \
-                                + self._bolts[n].getxVelocity())
             if ((self._bolts[n].getY() - BOLT_HEIGHT/2) > GAME_HEIGHT
                 ) or ((self._bolts[n].getY() + BOLT_HEIGHT/2) < 0
                 ) or ((self._bolts[n].getX()+BOLT_HEIGHT//2)<0
@@ -438,8 +445,8 @@ class Wave(object):
         
         For each alien in _aliens and each bolts in _bolts, checks that the bolt
         was fired from the player and that it collided with the alien. If so,
-        the Alien is set to None, and an exploded Alien animation is added to
-        _exploded. The bolt is deleted from the screen.
+        the Alien is set to None, and an explosion is spawned in the matching
+        particle system of _explosions. The bolt is deleted from the screen.
         """
         for row in range(ALIEN_ROWS):
             for col in range(ALIENS_IN_ROW):
@@ -447,10 +454,9 @@ class Wave(object):
                     while n < len(self._bolts):
                         if (not self._aliens[row][col] is None) and \
                                 self._aliens[row][col].collides(self._bolts[n]):
-                            self._exploded.append(Alien(
+                            self._explosions[int(row/2)%3].spawn(
                                 self._aliens[row][col].getX(),
-                                self._aliens[row][col].getY(),(int(row/2)%3)))
-                            self._exploded[-1].setFrame(2)
+                                self._aliens[row][col].getY())
                             self._aliens[row][col] = None
                             del self._bolts[n]
                             n -= 1
@@ -469,24 +475,19 @@ class Wave(object):
                     return False
         return True
         
-    def __explosionHandler(self):
+    def __explosionHandler(self, dt):
         """
         Handles the explosion animation of aliens.
         
-        For every exploded alien in _exploded (they are separated because
-        exploded aliens shouldn't walk or be able to fire bolts), it updates the
-        frame. If the animation sequence is finished, it is deleted. Slowing
-        down the animation sequence is done in models.py.
+        Every particle system in _explosions (they are separated from the
+        aliens because explosions shouldn't walk or be able to fire bolts)
+        advances all of its explosions at once, removing the finished ones.
+        
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
         """
-        n = 0
-        while n < len(self._exploded):
-            currentFrame = self._exploded[n].getFrame()
-            if currentFrame < 5:
-                self._exploded[n].setFrame(currentFrame+1)
-            else:
-                del self._exploded[n]
-                n -= 1
-            n += 1
+        for explosion in self._explosions:
+            explosion.update(dt)
                 
     def __shipHandler(self, userDirection):
         """